@@ -2,22 +2,653 @@ import tkinter as tk
 from tkinter import ttk, scrolledtext, filedialog, messagebox
 import sv_ttk
 import threading
+import argparse
 import json
+import hashlib
 import time
+import math
+import heapq
+import gc
+import tracemalloc
+import bisect
+from array import array
 import os
 import sys
 import ctypes
+from collections import defaultdict, deque, OrderedDict
 import hid
 import vgamepad as vg
-from typing import Dict, Optional
+from typing import Optional
 import keyboard as kb
 
+try:
+    import numpy as np
+except ImportError:     # mixing falls back to the pure-Python path
+    np = None
+
 # Constants
 VENDOR_ID = 0x352D
-PRODUCT_ID = 0x2386
 HID_USAGE = 0x0000
+# Model hint per product ID; the 0xa0 identity reply has the final say
+PRODUCT_MODELS = {
+    0x2382: "A75",
+    0x2383: "A75",
+    0x2384: "G75",
+    0x2385: None,
+    0x2386: "G75",
+}
 SETTINGS_FILE = "dd2rl.json"
+CATALOG_FILE = "dd2rl_catalog.json"
 DEFAULT_CONFIG_FILE = "config.json"
+CONTROL_PRESS_TRAVEL = 20     # Raw travel at which a control key fires
+CONTROL_RELEASE_TRAVEL = 6    # Raw travel below which it re-arms
+BUTTON_ACTUATION = 21         # Raw travel a button mapping presses at (past mid-travel)
+BUTTON_RELEASE = 20           # Raw travel it releases at
+RAPID_TRIGGER_DELTA = 3       # Default rapid-trigger travel change, in raw units
+DUAL_ACTUATION = 8            # Raw travel a tap/hold or shallow/deep key starts deciding at
+DEEP_TRAVEL = 32              # Raw travel that counts as a full press
+TAP_HOLD_MS = 200             # Held this long undecided -> hold
+SETTLE_MS = 20                # Not going deeper for this long -> shallow
+TAP_PULSE_MS = 30             # How long a decided tap is reported
+READ_TIMEOUT_MS = 5           # Upper bound on how long a HID read can delay Stop
+STOP_CHECK_INTERVAL = 0.02    # Longest sleep between checks for Stop
+SHUTDOWN_TIMEOUT = 0.05       # Seconds stop_controller waits for the reader thread
+PACKET_TYPE_SLOTS = (59, 118)  # Byte 4 of packets 1 and 2: always the packet type, never travel
+STALL_THRESHOLD = 0.010       # Scan older than poll interval + this -> drop it and scan again
+IDLE_AFTER = 2.0              # Seconds with every key at rest before idle polling starts
+PROBE_INTERVALS_MS = (1, 2, 3, 5, 10)   # Poll intervals swept by --probe-hid
+PROBE_DURATION = 1.0          # Seconds measured per probe setting
+PROBE_TIMEOUT_MS = 50         # A scan not complete by then counts as lost
+REALTIME_NICE = -10           # Thread nice value in real-time mode (Linux)
+JITTER_WINDOW = 5000          # Frame gaps kept for the jitter report
+GC_MODES = ('freeze', 'scheduled', 'disabled', 'default')
+WATCHDOG_BUDGET = 0.5         # Share of the poll interval one frame may take
+WATCHDOG_OVERRUNS = 5         # Over-budget frames in a row before the watchdog acts
+WATCHDOG_RECOVER = 1000       # Frames within budget before a shed stage comes back
+PROFILE_SECONDS = 10          # Length of a profile started from the GUI
+PROFILE_SAMPLE_INTERVAL = 0.001   # Seconds between stack samples while profiling
+ALLOCATION_BUDGET = 1.0       # Bytes per frame the scan loop may keep, for --check-allocations
+SCAN_REQUEST = [0x04, 0xb6, 0x03, 0x01]
+PROFILE_CACHE_SIZE = 8        # Compiled profiles kept ready for instant switching
+AUTO_SWITCH_INTERVAL = 0.5    # Seconds between foreground window checks
+MAX_OUTPUT_RATE = 2000        # Upper bound for output_rate_hz
+FULL_TRAVEL = 40              # Raw travel of a fully pressed key
+PREDICTION_HORIZON_MS = 8     # How far ahead travel prediction looks by default
+PREDICTION_MAX_LEAD = 6       # Largest predicted travel change, in raw units
+PREDICTION_HISTORY = 4        # Scans kept per key for the velocity estimate
+MIX_VECTORIZE_MIN = 32        # Mix entries from which the numpy path is used
+
+
+class KeyboardLayout:
+    """Fixed 128-slot key table with lookups built once"""
+    def __init__(self, model: str, names):
+        if len(names) != 128:
+            raise ValueError(f"{model} layout has {len(names)} slots, expected 128")
+        self.model = model
+        self.index_to_name = tuple(names)
+        self.name_to_index = {name: idx for idx, name in enumerate(names)
+                              if name and not name.startswith("u")}
+
+
+# Slot names as reported by the firmware (from the A75 web driver)
+_A75_KEYS = [
+    "u0", "ESC", "F1", "F2", "F3", "F4", "F5", "F6", "F7", "F8",
+    "F9", "F10", "F11", "F12", "PRTSCN", "KP7", "KP8", "KP9", "u1", "u2", "u3", "u4",
+    "SWUNG", "1", "2", "3", "4", "5", "6", "7", "8", "9", "0",
+    "MINUS", "PLUS", "BACK", "KP4", "KP5", "KP6", "u5", "u6", "u7", "u8",
+    "TAB", "Q", "W", "E", "R", "T", "Y", "U", "I", "O", "P",
+    "BRKTS_L", "BRKTS_R", "SLASH_K29", "KP1", "KP2", "KP3", "u9", "u10", "u11", "u12",
+    "CAPS", "A", "S", "D", "F", "G", "H", "J", "K", "L",
+    "COLON", "QOTATN", "u13", "RETURN", "u14", "KP0", "KP_DEL", "u15", "u16", "u17", "u18",
+    "SHF_L", "EUR_K45", "Z", "X", "C", "V", "B", "N", "M",
+    "COMMA", "PERIOD", "VIRGUE", "u19", "SHF_R", "ARR_UP", "u20", "NUMS", "u21", "u22", "u23", "u24",
+    "CTRL_L", "WIN_L", "ALT_L", "u25", "u26", "u27", "SPACE",
+    "u28", "u29", "u30", "ALT_R", "FN1", "APP", "u31", "ARR_L",
+    "ARR_DW", "ARR_R", "CTRL_R", "u32", "u33", "u34", "u35"
+]
+
+# G75 slots verified with debuggers/keyfinder.py: the keypad slots carry the nav cluster
+_G75_KEYS = [
+    "u0", "ESC", "F1", "F2", "F3", "F4", "F5", "F6", "F7", "F8",
+    "F9", "F10", "F11", "F12", "PRTSCN", "INS", "DEL", "KP9", "u2", "u3", "u4", "u5",
+    "SWUNG", "1", "2", "3", "4", "5", "6", "7", "8", "9", "0",
+    "MINUS", "PLUS", "BACK", "KP4", "HOME", "KP6", "u6", "u7", "u8", "u9",
+    "TAB", "Q", "W", "E", "R", "T", "Y", "U", "I", "O", "P",
+    "BRKTS_L", "BRKTS_R", "SLASH_K29", "KP1", "PGUP", "KP3", "u10", "u11", "u12", "u13",
+    "CAPS", "A", "S", "D", "F", "G", "H", "J", "K", "L",
+    "COLON", "QOTATN", "u14", "RETURN", "u15", "PGDN", "KP_DEL", "u16", "u17", "u18", "u19",
+    "SHF_L", "EUR_K45", "Z", "X", "C", "V", "B", "N", "M",
+    "COMMA", "PERIOD", "VIRGUE", "u20", "SHF_R", "ARR_UP", "u21", "NUMS", "u22", "u23", "u24", "u25",
+    "END", "WIN_L", "ALT_L", "u26", "u27", "u28", "SPACE",
+    "u29", "u30", "u31", "ALT_R", "FN1", "APP", "u32", "ARR_L",
+    "ARR_DW", "ARR_R", "CTRL_R", "u33", "u34", "u35", "u36"
+]
+
+# Keyed by (model, firmware); firmware None is the model-wide default
+LAYOUTS = {
+    ("G75", None): KeyboardLayout("G75", _G75_KEYS),
+    ("A75", None): KeyboardLayout("A75", _A75_KEYS),
+}
+DEFAULT_MODEL = "G75"
+
+# Identity reply bytes 5-7 -> model
+IDENTITIES = {
+    (11, 4, 5): "G75",
+    (11, 1, 1): "A75",
+}
+
+
+def identify_keyboard(reply, product_id: Optional[int] = None):
+    """Decode a 0xa0 identity reply into (model, firmware)"""
+    firmware = None
+    model = None
+    if reply and len(reply) >= 8 and reply[0] == 0x04 and reply[1] == 0xa0 \
+            and reply[2] == 0x02 and reply[3] == 0x00:
+        signature = tuple(reply[5:8])
+        firmware = ".".join(str(b) for b in signature)
+        model = IDENTITIES.get(signature)
+    if model is None:
+        model = PRODUCT_MODELS.get(product_id) or DEFAULT_MODEL
+    return model, firmware
+
+
+def get_layout(model: str, firmware: Optional[str] = None) -> KeyboardLayout:
+    """Pick the layout table for a model, preferring a firmware-specific one"""
+    layout = LAYOUTS.get((model, firmware))
+    if layout is None:
+        layout = LAYOUTS.get((model, None), LAYOUTS[(DEFAULT_MODEL, None)])
+    return layout
+
+
+# DrunkDeer key names -> keyboard module names (anything else is lowercased)
+KEYBOARD_KEY_NAMES = {
+    'SHF_L': 'shift',
+    'SHF_R': 'right shift',
+    'CTRL_L': 'ctrl',
+    'CTRL_R': 'right ctrl',
+    'ALT_L': 'alt',
+    'ALT_R': 'right alt',
+    'WIN_L': 'win',
+    'SPACE': 'space',
+    'RETURN': 'enter',
+    'BACK': 'backspace',
+    'TAB': 'tab',
+    'ESC': 'esc',
+    'CAPS': 'caps lock',
+    'APP': 'apps',
+    'MINUS': '-',
+    'PLUS': '=',
+    'BRKTS_L': '[',
+    'BRKTS_R': ']',
+    'COLON': ';',
+    'QOTATN': "'",
+    'COMMA': ',',
+    'PERIOD': '.',
+    'VIRGUE': '/',
+    'SLASH_K29': '\\',
+    'SWUNG': '`',
+    'INS': 'insert',
+    'DEL': 'delete',
+    'HOME': 'home',
+    'END': 'end',
+    'PGUP': 'page up',
+    'PGDN': 'page down',
+    'PRTSCN': 'print screen',
+}
+
+
+class KeyboardSuppressor:
+    """One hook_key handler per suppressed scan code, all gated by a shared active flag
+    
+    keyboard only calls a hook_key handler for its own scan code, so keys that
+    are not mapped pass through without running any Python. Toggling flips
+    self.active; a profile switch hooks and unhooks only the codes that changed.
+    """
+    def __init__(self):
+        self.scan_codes = frozenset()
+        self.active = False
+        self._held = set()
+        self._hooks = {}
+        self._installed = False
+    
+    @staticmethod
+    def resolve(key_names) -> frozenset:
+        """Scan codes for a set of keyboard module key names"""
+        codes = set()
+        for name in key_names:
+            try:
+                codes.update(kb.key_to_scan_codes(name))
+            except ValueError:
+                pass
+        return frozenset(codes)
+    
+    def install(self):
+        """Hook every scan code once; toggling afterwards only flips self.active"""
+        self._held.clear()
+        self._installed = True
+        self._sync()
+    
+    def set_scan_codes(self, scan_codes):
+        """Switch to a new set of suppressed keys, touching only the codes that differ"""
+        self.scan_codes = frozenset(scan_codes)
+        if self._installed:
+            self._sync()
+    
+    def remove(self):
+        """Unregister every handler"""
+        self.active = False
+        self._installed = False
+        # Keys held now get their key-up from the OS once the handlers are gone
+        self._held.clear()
+        for handle in self._hooks.values():
+            try:
+                kb.unhook(handle)
+            except:
+                pass
+        self._hooks.clear()
+    
+    def _sync(self):
+        for code in self.scan_codes - self._hooks.keys():
+            self._hooks[code] = kb.hook_key(code, self._handler(code), suppress=True)
+        # A dropped key that is still held keeps its handler until the next
+        # switch, so its key-up is swallowed along with its key-down
+        for code in self._hooks.keys() - self.scan_codes - self._held:
+            try:
+                kb.unhook(self._hooks.pop(code))
+            except:
+                pass
+    
+    def _handler(self, code):
+        # Returning False blocks the event. A key-up is blocked only if its
+        # key-down was, so switching profiles or toggling while a key is held
+        # never leaves it stuck down in the OS. keyboard keys its hook table by
+        # callback, so every code needs its own closure.
+        held = self._held
+        
+        def on_event(event) -> bool:
+            if event.event_type == kb.KEY_DOWN:
+                if self.active and code in self.scan_codes:
+                    held.add(code)
+                    return False
+                return True
+            if code in held:
+                held.discard(code)
+                return False
+            return True
+        return on_event
+
+
+def benchmark_suppression_hook(key_count: int = 20, iterations: int = 200000):
+    """Time keyboard's blocking dispatch with the suppressor's handlers against plain block_key
+    
+    The dispatch mirrors keyboard's listener: every blocking hook runs for
+    every event, then the handlers stored under the event's scan code. An
+    unmapped key finds an empty list in both setups.
+    """
+    class Event:
+        def __init__(self, scan_code):
+            self.scan_code = scan_code
+            self.event_type = kb.KEY_DOWN
+    
+    def dispatcher(blocking_hooks, blocking_keys):
+        def direct_callback(event):
+            for hook in blocking_hooks:
+                if not hook(event):
+                    return False
+            for hook in blocking_keys[event.scan_code]:
+                if not hook(event):
+                    return False
+            return True
+        return direct_callback
+    
+    codes = list(range(2, 2 + key_count))
+    suppressor = KeyboardSuppressor()
+    suppressor.scan_codes = frozenset(codes)
+    suppressor.active = True
+    handlers = defaultdict(list)
+    block_keys = defaultdict(list)
+    for code in codes:
+        handlers[code].append(suppressor._handler(code))
+        block_keys[code].append(lambda event: False)
+    
+    results = {}
+    for label, callback in ((f"hook_key x{key_count}", dispatcher([], handlers)),
+                            (f"block_key x{key_count}", dispatcher([], block_keys))):
+        for kind, event in (("blocked", Event(codes[-1])), ("passed", Event(200))):
+            start = time.perf_counter_ns()
+            for _ in range(iterations):
+                callback(event)
+            results[(label, kind)] = (time.perf_counter_ns() - start) / iterations
+    return results
+
+
+def benchmark_realtime(duration: float = 3.0, cpu: Optional[int] = None):
+    """p99 frame jitter of a simulated run with real-time mode off, then on"""
+    results = {}
+    for enabled in (False, True):
+        controller = DrunkDeerController()
+        controller.simulate = True
+        controller.config = {"suppression": {"enabled": False}}
+        controller.realtime_args = {"enabled": enabled, "cpu": cpu}
+        log = []
+        thread = threading.Thread(target=controller.run, args=(log.append,), daemon=True)
+        thread.start()
+        time.sleep(duration)
+        controller.stop()
+        thread.join(1.0)
+        results[enabled] = (jitter_p99(controller.frame_gaps.values()), [line for line in log if "Real-time" in line])
+    return results
+
+
+def check_allocations(config_path: Optional[str] = None, frames: int = 2000, warmup: int = 500):
+    """Net bytes per frame the scan loop keeps, from a simulated run with moving keys
+    
+    Only allocations made by this file are counted; anything above
+    ALLOCATION_BUDGET means the hot loop grows a structure per frame.
+    """
+    controller = DrunkDeerController()
+    controller.simulate = True
+    if config_path:
+        controller.load_config(config_path)
+    controller.config.pop('capture', None)
+    controller.capture_path = None
+    controller.poll_interval = 0.001
+    # Map without hooking the real keyboard
+    controller.config['suppression'] = {**controller.config.get('suppression', {}), 'enabled': False}
+    thread = threading.Thread(target=controller.run, args=(lambda message: None,), daemon=True)
+    thread.start()
+    
+    def wait_for(count):
+        step = 0
+        while controller.frames < count and thread.is_alive():
+            controller.controller_enabled = True
+            travel = abs(step % 80 - 40)     # full press and release every 80 steps
+            profile = controller.profile
+            for heights, key_idx in (profile.watched if profile else ()):
+                for reader in controller.readers:
+                    if reader.assembler.key_heights is heights:
+                        reader.device.key_heights[key_idx] = travel
+            step += 1
+            time.sleep(0.001)
+    
+    tracemalloc.start()
+    try:
+        wait_for(warmup)
+        gc.collect()
+        start_frames = controller.frames
+        before = tracemalloc.take_snapshot()
+        wait_for(start_frames + frames)
+        gc.collect()
+        after = tracemalloc.take_snapshot()
+        measured = controller.frames - start_frames
+    finally:
+        tracemalloc.stop()
+        controller.stop()
+        thread.join(1.0)
+    
+    only_here = [tracemalloc.Filter(True, os.path.abspath(__file__))]
+    stats = after.filter_traces(only_here).compare_to(before.filter_traces(only_here), 'lineno')
+    growth = sum(stat.size_diff for stat in stats)
+    return {
+        'frames': measured,
+        'bytes_per_frame': growth / measured if measured else 0.0,
+        'top': [stat for stat in stats if stat.size_diff > 0][:5],
+    }
+
+
+def profile_filename(name: str) -> str:
+    """Collapsed-stack file name for a controller profile of the given game profile, stamped with the time"""
+    safe = "".join(c if c.isalnum() or c in "-_" else "_" for c in name) or "controller"
+    return f"{safe}-{time.strftime('%Y%m%d-%H%M%S')}.folded"
+
+
+def probe_hid(device, strategy: str = 'serial', interval_ms: float = 5, duration: float = PROBE_DURATION) -> dict:
+    """Drive the 0xb6/0xb7 scan loop one way for a while and measure it
+    
+    'serial' waits interval_ms after each complete scan before the next
+    request, like the reader. 'pipelined' sends the next request as soon as
+    the first packet of the current one arrives, to find the board's ceiling.
+    """
+    request = SCAN_REQUEST
+    outstanding = deque()       # send times of unanswered requests
+    arrivals = {0: [], 1: [], 2: []}
+    missing = {0: 0, 1: 0, 2: 0}   # packets of each type that never came
+    rtts = []
+    seen = set()
+    sent = complete = lost = 0
+    
+    start = time.perf_counter()
+    end = start + duration
+    device.write(request)
+    outstanding.append(time.perf_counter())
+    sent += 1
+    while time.perf_counter() < end:
+        data = device.read(65, timeout_ms=PROBE_TIMEOUT_MS)
+        now = time.perf_counter()
+        if not data:
+            lost += len(outstanding)
+            for packet_type in missing:
+                missing[packet_type] += len(outstanding) - (packet_type in seen)
+            outstanding.clear()
+            seen.clear()
+            device.write(request)
+            outstanding.append(time.perf_counter())
+            sent += 1
+            continue
+        if len(data) < 5 or data[0] != 0x04 or data[1] != 0xb7 or data[4] not in arrivals or not outstanding:
+            continue
+        
+        packet_type = data[4]
+        arrivals[packet_type].append(now - outstanding[0])
+        seen.add(packet_type)
+        if packet_type == 0 and strategy == 'pipelined' and len(outstanding) < 2:
+            device.write(request)
+            outstanding.append(time.perf_counter())
+            sent += 1
+        if packet_type != 2:
+            continue
+        
+        sent_at = outstanding.popleft()
+        if len(seen) == 3:
+            complete += 1
+            rtts.append(now - sent_at)
+        else:
+            lost += 1
+            for packet_type in missing.keys() - seen:
+                missing[packet_type] += 1
+        seen.clear()
+        if not outstanding:
+            if strategy == 'serial' and interval_ms:
+                time.sleep(interval_ms / 1000.0)
+            device.write(request)
+            outstanding.append(time.perf_counter())
+            sent += 1
+    elapsed = time.perf_counter() - start
+    
+    # Let the last answers arrive so they do not leak into the next setting
+    while device.read(65, timeout_ms=PROBE_TIMEOUT_MS):
+        pass
+    
+    def spread(values):
+        # Standard deviation in ms
+        if len(values) < 2:
+            return 0.0
+        mean = sum(values) / len(values)
+        return math.sqrt(sum((v - mean) ** 2 for v in values) / (len(values) - 1)) * 1000
+    
+    rtts.sort()
+    return {
+        "strategy": strategy,
+        "interval_ms": interval_ms if strategy == 'serial' else 0,
+        "scans_per_second": complete / elapsed,
+        "loss": lost / max(sent, 1),
+        "rtt_ms": rtts[len(rtts) // 2] * 1000 if rtts else None,
+        "rtt_p99_ms": rtts[int(0.99 * (len(rtts) - 1))] * 1000 if rtts else None,
+        "jitter_ms": {packet_type: spread(times) for packet_type, times in arrivals.items()},
+        "packet_loss": {packet_type: count / max(sent, 1) for packet_type, count in missing.items()},
+    }
+
+
+def recommend_poll_interval(results) -> Optional[int]:
+    """Shortest serial interval with no loss and a steady round trip, else the longest tried"""
+    serial = sorted((r for r in results if r['strategy'] == 'serial' and r['rtt_ms'] is not None),
+                    key=lambda r: r['interval_ms'])
+    for result in serial:
+        if result['loss'] <= 0.001 and result['rtt_p99_ms'] - result['rtt_ms'] <= 1.0:
+            return int(result['interval_ms'])
+    return int(serial[-1]['interval_ms']) if serial else None
+
+
+def load_poll_tuning() -> dict:
+    """Saved --probe-hid results from dd2rl.json, keyed by HID path"""
+    try:
+        with open(SETTINGS_FILE, 'r') as f:
+            return json.load(f).get('poll_tuning', {})
+    except (OSError, ValueError, AttributeError):
+        return {}
+
+
+def save_poll_tuning(path: str, entry: dict):
+    """Store one board's probe result in dd2rl.json, keeping the other settings"""
+    try:
+        with open(SETTINGS_FILE, 'r') as f:
+            settings = json.load(f)
+    except (OSError, ValueError):
+        settings = {}
+    settings.setdefault('poll_tuning', {})[path] = entry
+    with open(SETTINGS_FILE, 'w') as f:
+        json.dump(settings, f)
+
+
+def run_hid_probe(simulate: bool = False):
+    """Probe every connected board, print the sweep and save the recommended interval"""
+    if simulate:
+        boards = [("simulated", None, SimulatedDevice())]
+    else:
+        boards = []
+        for dev in enumerate_keyboards():
+            path = dev['path'].decode('utf-8', 'replace') if isinstance(dev['path'], bytes) else dev['path']
+            device = hid.device()
+            device.open_path(dev['path'])
+            device.set_nonblocking(False)
+            boards.append((dev.get('product_string') or path, path, device))
+    if not boards:
+        print("No DrunkDeer keyboard found")
+        return
+    
+    for name, path, device in boards:
+        print(f"{name}:")
+        print(f"{'strategy':>10} {'interval':>8} {'scans/s':>8} {'loss':>6} {'rtt':>6} {'p99':>6}  jitter 0/1/2 (ms)  loss 0/1/2 (%)")
+        results = [probe_hid(device, 'serial', interval) for interval in PROBE_INTERVALS_MS]
+        results.append(probe_hid(device, 'pipelined'))
+        for r in results:
+            rtt = f"{r['rtt_ms']:6.2f} {r['rtt_p99_ms']:6.2f}" if r['rtt_ms'] is not None else f"{'-':>6} {'-':>6}"
+            jitter = "/".join(f"{r['jitter_ms'][t]:.2f}" for t in (0, 1, 2))
+            packet_loss = "/".join(f"{r['packet_loss'][t] * 100:.1f}" for t in (0, 1, 2))
+            print(f"{r['strategy']:>10} {r['interval_ms']:>6}ms {r['scans_per_second']:8.1f} "
+                  f"{r['loss'] * 100:5.1f}% {rtt}  {jitter}  {packet_loss}")
+        
+        interval = recommend_poll_interval(results)
+        if interval is None:
+            print("  No complete scans - nothing to recommend")
+        else:
+            print(f"  Recommended poll interval: {interval} ms")
+            if path:
+                rate = next(r['scans_per_second'] for r in results if r['interval_ms'] == interval
+                            and r['strategy'] == 'serial')
+                save_poll_tuning(path, {"poll_interval_ms": interval, "scans_per_second": round(rate, 1),
+                                        "measured": time.strftime("%Y-%m-%d %H:%M")})
+                print(f"  Saved for {path}")
+        device.close()
+
+
+def save_capture(path: str, frames):
+    """Write captured (time ns, heights) scans as JSON lines"""
+    with open(path, 'w') as f:
+        for t, heights in frames:
+            f.write(json.dumps({"t": t, "heights": heights}) + "\n")
+
+
+def load_capture(path: str):
+    """Read a capture written by save_capture"""
+    frames = []
+    with open(path, 'r') as f:
+        for line in f:
+            if line.strip():
+                frame = json.loads(line)
+                frames.append((frame['t'], frame['heights']))
+    return frames
+
+
+def evaluate_prediction(frames, horizon_ms: float = PREDICTION_HORIZON_MS,
+                        max_lead: float = PREDICTION_MAX_LEAD, history: int = PREDICTION_HISTORY):
+    """Replay a capture through TravelPredictor and compare against what really came next
+    
+    Errors are in raw travel units against the true travel horizon_ms later.
+    The effective lead is the shift of the true travel that the predicted (or
+    raw) signal matches best; their difference is the latency prediction saves.
+    """
+    if len(frames) < 2:
+        raise ValueError("capture has fewer than two scans")
+    # Only keys that moved; constant slots would add zero-error samples every scan
+    first = frames[0][1]
+    keys = [i for i in range(len(first)) if i not in PACKET_TYPE_SLOTS
+            and any(heights[i] != first[i] for _, heights in frames)]
+    if not keys:
+        raise ValueError("no key moved during the capture")
+    source = list(frames[0][1])
+    predictor = TravelPredictor(source, horizon_ms, max_lead, history)
+    for key in keys:
+        predictor.track(key)
+    
+    times = [t for t, _ in frames]
+    raw, predicted = [], []
+    for t, heights in frames:
+        source[:] = heights
+        predictor.update(t)
+        raw.append([heights[key] for key in keys])
+        predicted.append([predictor.heights[key] for key in keys])
+    
+    def actual(k: int, t: float):
+        # True travel of keys[k] at time t, linear between scans; None past the end
+        i = bisect.bisect_left(times, t)
+        if i >= len(times):
+            return None
+        if times[i] == t or i == 0:
+            return frames[i][1][keys[k]]
+        t0, t1 = times[i - 1], times[i]
+        v0, v1 = frames[i - 1][1][keys[k]], frames[i][1][keys[k]]
+        return v0 + (v1 - v0) * (t - t0) / (t1 - t0)
+    
+    def errors(signal, shift_ns: float):
+        result = []
+        for n, t in enumerate(times):
+            for k in range(len(keys)):
+                future = actual(k, t + shift_ns)
+                if future is None:
+                    break
+                if signal[n][k] or future:
+                    result.append(abs(signal[n][k] - future))
+        return result
+    
+    def best_shift(signal):
+        shifts = range(0, int(2 * horizon_ms) + 1)
+        scores = [sum(errors(signal, ms * 1e6)) for ms in shifts]
+        return shifts[scores.index(min(scores))]
+    
+    raw_errors = sorted(errors(raw, horizon_ms * 1e6))
+    predicted_errors = sorted(errors(predicted, horizon_ms * 1e6))
+    p95 = lambda values: values[int(0.95 * (len(values) - 1))] if values else 0.0
+    raw_lead, predicted_lead = best_shift(raw), best_shift(predicted)
+    return {
+        "scans": len(frames),
+        "keys": len(keys),
+        "raw_mean_error": sum(raw_errors) / max(len(raw_errors), 1),
+        "raw_p95_error": p95(raw_errors),
+        "predicted_mean_error": sum(predicted_errors) / max(len(predicted_errors), 1),
+        "predicted_p95_error": p95(predicted_errors),
+        "latency_saved_ms": predicted_lead - raw_lead,
+    }
 
 
 def is_admin():
@@ -121,66 +752,1777 @@ def create_default_config():
         json.dump(default_config, f, indent=2)
 
 
+class SimulatedDevice:
+    """In-memory stand-in for hid.device that answers like a G75.
+
+    Set entries of key_heights to simulate key travel. Reads block until a
+    reply is queued or timeout_ms expires, just like hidapi.
+    """
+    def __init__(self, scan_time: float = 0.001):
+        self.key_heights = [0] * 128
+        self.scan_time = scan_time
+        self.closed = False
+        self._replies = deque()
+        self._cond = threading.Condition()
+
+    def set_nonblocking(self, nonblocking):
+        pass
+
+    def write(self, data) -> int:
+        if self.closed:
+            raise OSError("device closed")
+        with self._cond:
+            if data[1] == 0xa0:
+                self._replies.append([0x04, 0xa0, 0x02, 0x00, 0x00, 11, 4, 5])
+            elif data[1] == 0xb6:
+                for packet_type, base, length in ((0, 0, 59), (1, 59, 59), (2, 118, 8)):
+                    # Byte 4 doubles as the packet type and the first key slot
+                    packet = [0x04, 0xb7, 0x00, 0x00, packet_type]
+                    packet.extend(self.key_heights[base + 1:base + length])
+                    self._replies.append(packet)
+            self._cond.notify()
+        return len(data)
+
+    def read(self, size: int, timeout_ms: int = 0):
+        if self.closed:
+            raise OSError("device closed")
+        with self._cond:
+            if not self._replies:
+                self._cond.wait(timeout_ms / 1000.0)
+            if not self._replies:
+                return []
+            reply = self._replies.popleft()
+        if reply[1] == 0xb7 and reply[4] == 2 and self.scan_time:
+            time.sleep(self.scan_time)
+        return reply[:size]
+
+    def close(self):
+        self.closed = True
+
+
+class ControlKey:
+    """Action fired when a key's travel crosses its press point, with hysteresis"""
+    def __init__(self, index: int, action, press_travel: int = CONTROL_PRESS_TRAVEL,
+                 release_travel: int = CONTROL_RELEASE_TRAVEL):
+        self.index = index
+        self.action = action
+        self.press_travel = press_travel
+        self.release_travel = release_travel
+        self.held = False
+
+
+class FrameAssembler:
+    """Collects the three 0xb7 packets of a scan into one 128-key frame"""
+    def __init__(self):
+        self.key_heights = [0] * 128
+        self.control_keys = []
+    
+    def reset(self):
+        """Forget all key state"""
+        for i in range(len(self.key_heights)):
+            self.key_heights[i] = 0
+        for control in self.control_keys:
+            control.held = False
+    
+    def feed(self, data) -> bool:
+        """Apply one HID report; True once the last packet of a scan has arrived"""
+        if not data or len(data) < 5:
+            return False
+        
+        if data[0] != 0x04 or data[1] != 0xb7:
+            return False
+        
+        packet_type = data[4]
+        if packet_type == 0:
+            base, length = 0, 59
+        elif packet_type == 1:
+            base, length = 59, 59
+        elif packet_type == 2:
+            base, length = 118, 8
+        else:
+            return False
+        
+        key_heights = self.key_heights
+        for i in range(length):
+            idx = base + i
+            if idx >= len(key_heights):
+                continue
+            key_heights[idx] = data[i + 4] if (i + 4) < len(data) else 0
+        
+        return packet_type == 2
+    
+    def run_controls(self):
+        """Fire control keys that crossed their press point in the current frame"""
+        for control in self.control_keys:
+            height = self.key_heights[control.index]
+            if control.held:
+                if height <= control.release_travel:
+                    control.held = False
+            elif height >= control.press_travel:
+                control.held = True
+                control.action()
+
+
+# Report slots of a virtual pad
+AXES = ('LEFT_STICK_X', 'LEFT_STICK_Y', 'RIGHT_STICK_X', 'RIGHT_STICK_Y',
+        'LEFT_TRIGGER', 'RIGHT_TRIGGER')
+LEFT_TRIGGER_AXIS = 4
+RIGHT_TRIGGER_AXIS = 5
+
+# Analog 'controller' values -> (axis, sign), matched as substrings in this order
+ANALOG_TARGETS = (
+    ('LEFT_STICK_X_NEGATIVE', 0, -1.0),
+    ('LEFT_STICK_X_POSITIVE', 0, 1.0),
+    ('LEFT_STICK_Y_NEGATIVE', 1, -1.0),
+    ('LEFT_STICK_Y_POSITIVE', 1, 1.0),
+    ('RIGHT_STICK_X_NEGATIVE', 2, -1.0),
+    ('RIGHT_STICK_X_POSITIVE', 2, 1.0),
+    ('RIGHT_STICK_Y_NEGATIVE', 3, -1.0),
+    ('RIGHT_STICK_Y_POSITIVE', 3, 1.0),
+    ('LEFT_TRIGGER', LEFT_TRIGGER_AXIS, 1.0),
+    ('RIGHT_TRIGGER', RIGHT_TRIGGER_AXIS, 1.0),
+)
+
+BUTTONS = {
+    'A_BUTTON': vg.XUSB_BUTTON.XUSB_GAMEPAD_A,
+    'B_BUTTON': vg.XUSB_BUTTON.XUSB_GAMEPAD_B,
+    'X_BUTTON': vg.XUSB_BUTTON.XUSB_GAMEPAD_X,
+    'Y_BUTTON': vg.XUSB_BUTTON.XUSB_GAMEPAD_Y,
+    'LEFT_BUMPER': vg.XUSB_BUTTON.XUSB_GAMEPAD_LEFT_SHOULDER,
+    'RIGHT_BUMPER': vg.XUSB_BUTTON.XUSB_GAMEPAD_RIGHT_SHOULDER,
+    'START_BUTTON': vg.XUSB_BUTTON.XUSB_GAMEPAD_START,
+    'BACK_BUTTON': vg.XUSB_BUTTON.XUSB_GAMEPAD_BACK,
+    'LEFT_STICK_CLICK': vg.XUSB_BUTTON.XUSB_GAMEPAD_LEFT_THUMB,
+    'RIGHT_STICK_CLICK': vg.XUSB_BUTTON.XUSB_GAMEPAD_RIGHT_THUMB,
+    'DPAD_UP': vg.XUSB_BUTTON.XUSB_GAMEPAD_DPAD_UP,
+    'DPAD_DOWN': vg.XUSB_BUTTON.XUSB_GAMEPAD_DPAD_DOWN,
+    'DPAD_LEFT': vg.XUSB_BUTTON.XUSB_GAMEPAD_DPAD_LEFT,
+    'DPAD_RIGHT': vg.XUSB_BUTTON.XUSB_GAMEPAD_DPAD_RIGHT,
+}
+BUTTON_BITS = tuple(int(button) for button in BUTTONS.values())
+
+
+class DualState:
+    """Per-key state machine giving one button on tap (or shallow press) and another on hold (or full press)
+    
+    Travel and velocity decide early: a key that starts rising is a tap before
+    it is fully released, a key that reaches DEEP_TRAVEL is a full press at once,
+    and a key that stops going deeper settles as shallow.
+    """
+    IDLE, PENDING, ACTIVE, PULSE = range(4)
+    __slots__ = ('mode', 'first', 'second', 'actuation', 'release', 'deep', 'hold_time', 'settle_time',
+                 'phase', 'output', 'since', 'moved_at', 'peak', 'pulse_end')
+    
+    def __init__(self, mode: str, first: int, second: int, actuation: int = DUAL_ACTUATION,
+                 deep: int = DEEP_TRAVEL, hold_ms: float = TAP_HOLD_MS, settle_ms: float = SETTLE_MS):
+        self.mode = mode        # "tap" (tap/hold) or "depth" (shallow/deep)
+        self.first = first      # tap / shallow button bits
+        self.second = second    # hold / deep button bits
+        self.actuation = actuation
+        self.release = max(actuation - 2, 0)
+        self.deep = max(deep, actuation + 1)
+        self.hold_time = hold_ms / 1000
+        self.settle_time = settle_ms / 1000
+        self.phase = self.IDLE
+        self.output = 0
+        self.since = self.moved_at = self.pulse_end = 0.0
+        self.peak = 0
+    
+    @classmethod
+    def from_mapping(cls, mapping: dict) -> Optional['DualState']:
+        """Build from a buttons entry with tap/hold or shallow/deep, or None if a button is unknown"""
+        mode, keys = ('depth', ('shallow', 'deep')) if 'shallow' in mapping else ('tap', ('tap', 'hold'))
+        first, second = (mapping.get(key) for key in keys)
+        if first not in BUTTONS or second not in BUTTONS:
+            return None
+        return cls(mode, int(BUTTONS[first]), int(BUTTONS[second]),
+                   mapping.get('actuation', DUAL_ACTUATION), mapping.get('deep_travel', DEEP_TRAVEL),
+                   mapping.get('hold_ms', TAP_HOLD_MS), mapping.get('settle_ms', SETTLE_MS))
+    
+    def update(self, height: int, now: float) -> int:
+        """Advance with this frame's travel; returns the button bits to report"""
+        phase = self.phase
+        if phase == self.IDLE:
+            if height < self.actuation:
+                return 0
+            self.phase = phase = self.PENDING
+            self.since = self.moved_at = now
+            self.peak = height
+        
+        if phase == self.PENDING:
+            if height > self.peak:
+                self.peak = height
+                self.moved_at = now
+            if height <= self.release:
+                return self._pulse(now)
+            if self.mode == 'depth':
+                if height >= self.deep:
+                    return self._activate(self.second)
+                if now - self.moved_at >= self.settle_time:
+                    return self._activate(self.first)
+            else:
+                if self.peak - height >= RAPID_TRIGGER_DELTA:
+                    return self._pulse(now)
+                if now - self.since >= self.hold_time:
+                    return self._activate(self.second)
+            return 0
+        
+        if phase == self.ACTIVE:
+            if height <= self.release:
+                self.phase = self.IDLE
+                self.output = 0
+            elif self.mode == 'depth' and height >= self.deep:
+                self.output = self.second
+            return self.output
+        
+        # PULSE: report the tap briefly, then wait for the key to come back up
+        if now >= self.pulse_end:
+            self.output = 0
+            if height <= self.release:
+                self.phase = self.IDLE
+        return self.output
+    
+    def _pulse(self, now: float) -> int:
+        self.phase = self.PULSE
+        self.pulse_end = now + TAP_PULSE_MS / 1000
+        self.output = self.first
+        return self.first
+    
+    def _activate(self, bits: int) -> int:
+        self.phase = self.ACTIVE
+        self.output = bits
+        return bits
+
+
+# controller_mappings sections that map DrunkDeer keys
+MAPPING_SECTIONS = ('analog', 'buttons', 'macros')
+
+
+class Macro:
+    """A timed button sequence, or turbo while held, fired by one key
+    
+    Steps advance from MacroScheduler deadlines rather than sleeping, so a
+    macro costs nothing between its steps.
+    """
+    __slots__ = ('steps', 'turbo', 'half_period', 'bits', 'held', 'step', 'generation')
+    
+    def __init__(self, steps=(), turbo: int = 0, rate_hz: float = 0.0):
+        self.steps = tuple(steps)    # (button bits, duration ns)
+        self.turbo = turbo
+        self.half_period = int(5e8 / rate_hz) if rate_hz > 0 else 0
+        self.bits = 0
+        self.held = False
+        self.step = -1
+        self.generation = 0         # bumped to drop deadlines already on the heap
+    
+    @classmethod
+    def from_mapping(cls, mapping: dict) -> Optional['Macro']:
+        """Build from a macros entry (steps or turbo), or None if it names unknown buttons"""
+        if 'turbo' in mapping:
+            if mapping['turbo'] not in BUTTONS:
+                return None
+            return cls(turbo=int(BUTTONS[mapping['turbo']]), rate_hz=mapping.get('rate_hz', 10))
+        steps = []
+        for step in mapping.get('steps', ()):
+            bits = 0
+            for name in step.get('buttons', ()):
+                if name not in BUTTONS:
+                    return None
+                bits |= int(BUTTONS[name])
+            steps.append((bits, int(step.get('ms', 0) * 1_000_000)))
+        return cls(steps) if steps else None
+    
+    def reset(self):
+        self.bits = 0
+        self.held = False
+        self.step = -1
+        self.generation += 1
+    
+    def key(self, height: int, now: int, scheduler: 'MacroScheduler'):
+        """Edge-detect the trigger key and start or stop the macro"""
+        if self.held:
+            if height > BUTTON_RELEASE:
+                return
+            self.held = False
+            if self.turbo:
+                self.bits = 0
+                self.generation += 1
+        elif height >= BUTTON_ACTUATION:
+            self.held = True
+            if self.turbo:
+                self.bits = self.turbo
+                scheduler.schedule(now + self.half_period, self)
+            elif self.step < 0:
+                self.step = 0
+                self.bits = self.steps[0][0]
+                scheduler.schedule(now + self.steps[0][1], self)
+    
+    def fire(self, deadline: int, scheduler: 'MacroScheduler'):
+        """Advance at a due deadline; the next one counts from this deadline, not from now"""
+        if self.turbo:
+            self.bits ^= self.turbo
+            scheduler.schedule(deadline + self.half_period, self)
+            return
+        self.step += 1
+        if self.step >= len(self.steps):
+            self.step = -1
+            self.bits = 0
+            return
+        self.bits, duration = self.steps[self.step]
+        scheduler.schedule(deadline + duration, self)
+
+
+class MacroScheduler:
+    """Min-heap of macro deadlines on perf_counter_ns, run from the output thread"""
+    def __init__(self):
+        self._heap = []
+        self._seq = 0
+    
+    def schedule(self, deadline: int, macro: Macro):
+        heapq.heappush(self._heap, (deadline, self._seq, macro, macro.generation))
+        self._seq += 1
+    
+    def run_due(self, now: int):
+        """Fire every deadline up to now, O(log n) each"""
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            deadline, _, macro, generation = heapq.heappop(heap)
+            if generation == macro.generation:
+                macro.fire(deadline, self)
+    
+    def next_deadline(self) -> Optional[int]:
+        return self._heap[0][0] if self._heap else None
+    
+    def clear(self):
+        self._heap.clear()
+
+
+# How opposing keys on one stick axis combine
+SOCD_MODES = ('sum', 'last', 'deepest', 'neutral')
+
+# Stick name -> (x axis, y axis), for 2D shaping
+STICKS = {'LEFT_STICK': (0, 1), 'RIGHT_STICK': (2, 3)}
+
+
+def analog_target(controller_action: str):
+    """(axis, sign) for an analog 'controller' value, or None"""
+    for name, axis, sign in ANALOG_TARGETS:
+        if name in controller_action:
+            return axis, sign
+    return None
+
+
+class ButtonState:
+    """Thresholds and rapid-trigger state of one button mapping, updated in place"""
+    __slots__ = ('actuation', 'release', 'rapid', 'press_delta', 'release_delta', 'pressed', 'extreme')
+    
+    def __init__(self, actuation: int = BUTTON_ACTUATION, release: int = BUTTON_RELEASE,
+                 rapid: bool = False, press_delta: int = RAPID_TRIGGER_DELTA,
+                 release_delta: int = RAPID_TRIGGER_DELTA):
+        self.actuation = actuation
+        self.release = min(release, actuation - 1)
+        self.rapid = rapid
+        self.press_delta = max(press_delta, 1)
+        self.release_delta = max(release_delta, 1)
+        self.pressed = False
+        self.extreme = 0    # deepest travel while pressed, shallowest while released
+    
+    @classmethod
+    def from_mapping(cls, mapping: dict) -> 'ButtonState':
+        """Build from a button mapping's actuation/release/rapid_trigger fields"""
+        actuation = mapping.get('actuation', BUTTON_ACTUATION)
+        release = mapping.get('release', BUTTON_RELEASE if 'actuation' not in mapping else actuation - 1)
+        rapid = mapping.get('rapid_trigger', False)
+        if isinstance(rapid, dict):
+            return cls(actuation, release, True,
+                       rapid.get('press_delta', RAPID_TRIGGER_DELTA),
+                       rapid.get('release_delta', RAPID_TRIGGER_DELTA))
+        return cls(actuation, release, bool(rapid))
+
+
+class AxisResolver:
+    """SOCD resolution for one stick axis, tracking the order its keys went down"""
+    __slots__ = ('axis', 'mode', 'entries', 'stamps', 'tick')
+    
+    def __init__(self, axis: int, mode: str, entries):
+        self.axis = axis
+        self.mode = mode
+        self.entries = entries              # (heights, key_idx, axis, sign)
+        self.stamps = [0] * len(entries)    # press order per entry, 0 while up
+        self.tick = 0
+    
+    def resolve(self, normalize) -> float:
+        """The axis value for the current frame"""
+        entries = self.entries
+        stamps = self.stamps
+        mode = self.mode
+        winner = 0.0
+        best_value = 0.0
+        best_stamp = 0
+        positive = negative = 0.0
+        for i in range(len(entries)):
+            heights, key_idx, _, sign = entries[i]
+            value = normalize(heights[key_idx])
+            if value <= 0.0:
+                stamps[i] = 0
+                continue
+            stamp = stamps[i]
+            if not stamp:
+                self.tick += 1
+                stamp = stamps[i] = self.tick
+            
+            if mode == 'neutral':
+                if sign > 0:
+                    positive += value
+                else:
+                    negative += value
+                continue
+            if mode == 'last':
+                better = stamp > best_stamp
+            else:   # deepest, ties to the later press
+                better = value > best_value or (value == best_value and stamp > best_stamp)
+            if better:
+                winner = sign * value
+                best_value = value
+                best_stamp = stamp
+        
+        if mode == 'neutral':
+            return 0.0 if positive and negative else positive - negative
+        return winner
+
+
+class StickShape:
+    """Deadzones, clamp and anti-deadzone of one stick, precomputed from its config"""
+    __slots__ = ('x', 'y', 'radial', 'circular', 'deadzone', 'limit', 'anti', 'scale')
+    
+    def __init__(self, x: int, y: int, deadzone: float = 0.0, outer_deadzone: float = 0.0,
+                 anti_deadzone: float = 0.0, radial: bool = True, circular: bool = True):
+        self.x = x
+        self.y = y
+        self.radial = radial
+        self.circular = circular
+        self.deadzone = min(max(deadzone, 0.0), 0.95)
+        self.limit = max(1.0 - max(outer_deadzone, 0.0), self.deadzone + 0.05)
+        self.anti = min(max(anti_deadzone, 0.0), 0.95)
+        # Input between deadzone and limit maps linearly onto anti..1
+        self.scale = (1.0 - self.anti) / (self.limit - self.deadzone)
+    
+    @classmethod
+    def from_config(cls, stick: str, config: dict) -> 'StickShape':
+        """Build from a controller_mappings.sticks entry"""
+        x, y = STICKS[stick]
+        return cls(x, y, config.get('deadzone', 0.0), config.get('outer_deadzone', 0.0),
+                   config.get('anti_deadzone', 0.0), config.get('deadzone_shape', 'radial') != 'axial',
+                   config.get('clamp', 'circle') != 'square')
+    
+    def _curve(self, magnitude: float) -> float:
+        if magnitude <= self.deadzone:
+            return 0.0
+        return self.anti + (min(magnitude, self.limit) - self.deadzone) * self.scale
+    
+    def apply(self, axes):
+        """Shape the stick's two axes in place"""
+        x = axes[self.x]
+        y = axes[self.y]
+        if self.radial:
+            magnitude = math.hypot(x, y) if self.circular else max(abs(x), abs(y))
+            if magnitude <= self.deadzone:
+                x = y = 0.0
+            else:
+                factor = self._curve(magnitude) / magnitude
+                x *= factor
+                y *= factor
+        else:
+            x = math.copysign(self._curve(abs(x)), x)
+            y = math.copysign(self._curve(abs(y)), y)
+            if self.circular:
+                magnitude = math.hypot(x, y)
+                if magnitude > 1.0:
+                    x /= magnitude
+                    y /= magnitude
+        axes[self.x] = x
+        axes[self.y] = y
+
+
+class MixMatrix:
+    """Sparse weighted key -> axis matrix for one pad
+    
+    Entries are kept grouped by board so the numpy path gathers with one index
+    per board; both paths then add the products per axis in the same order and
+    give bit-identical sums.
+    """
+    def __init__(self, entries, vectorize: Optional[bool] = None):
+        boards = {}
+        for entry in entries:
+            boards.setdefault(id(entry[0]), len(boards))
+        self.entries = sorted(entries, key=lambda entry: boards[id(entry[0])])
+        self.sums = [0.0] * len(AXES)
+        if vectorize is None:
+            vectorize = len(self.entries) >= MIX_VECTORIZE_MIN
+        self.groups = None
+        if vectorize and np is not None:
+            self.groups = []
+            for entry in self.entries:
+                if not self.groups or self.groups[-1][0] is not entry[0]:
+                    self.groups.append((entry[0], []))
+                self.groups[-1][1].append(entry[1])
+            self.groups = [(heights, np.array(indices, dtype=np.intp)) for heights, indices in self.groups]
+            self.axis_index = np.array([entry[2] for entry in self.entries], dtype=np.intp)
+            self.weights = np.array([entry[3] for entry in self.entries], dtype=np.float64)
+            self.totals = np.zeros(len(AXES))
+    
+    def evaluate(self, normalize, deadzone_min: int, deadzone_max: int):
+        """Per-axis weighted sums for the current frame"""
+        sums = self.sums
+        if self.groups is None:
+            for i in range(len(sums)):
+                sums[i] = 0.0
+            for heights, key_idx, axis, weight in self.entries:
+                value = normalize(heights[key_idx])
+                if value:
+                    sums[axis] += weight * value
+            return sums
+        
+        raw = np.concatenate([np.asarray(heights, dtype=np.float64)[indices] for heights, indices in self.groups])
+        values = np.where(raw < deadzone_min, 0.0, np.minimum(raw, deadzone_max) / 40.0)
+        totals = self.totals
+        totals.fill(0.0)
+        np.add.at(totals, self.axis_index, self.weights * values)
+        sums[:] = totals.tolist()
+        return sums
+
+
+class PadMapping:
+    """Flat mapping tables for one virtual pad, compiled from the config"""
+    TABLES = ('sticks', 'triggers', 'buttons', 'duals', 'macros', 'mixes')
+    
+    def __init__(self):
+        self.sticks = []     # (heights, key_idx, axis, sign)
+        self.triggers = []   # (heights, key_idx, axis)
+        self.buttons = []    # (heights, key_idx, button, ButtonState)
+        self.duals = []      # (heights, key_idx, DualState)
+        self.macros = []     # (heights, key_idx, Macro)
+        self.mixes = []      # (heights, key_idx, axis, weight)
+        self.mix = None      # MixMatrix over mixes
+        self.socd = {}       # axis -> SOCD mode, for axes not simply summed
+        self.summed = []     # sticks on summed axes
+        self.resolvers = []  # AxisResolver for the other axes
+        self.shaping = {}    # stick name -> StickShape
+        self.shapes = []
+    
+    def build(self):
+        """Split the stick table into summed entries and per-axis resolvers"""
+        groups = {}
+        self.summed = []
+        for entry in self.sticks:
+            if self.socd.get(entry[2], 'sum') == 'sum':
+                self.summed.append(entry)
+            else:
+                groups.setdefault(entry[2], []).append(entry)
+        self.resolvers = [AxisResolver(axis, self.socd[axis], entries) for axis, entries in groups.items()]
+        self.shapes = list(self.shaping.values())
+        self.mix = MixMatrix(self.mixes) if self.mixes else None
+        return self
+    
+    @staticmethod
+    def _slot(entry):
+        # Predicted travel counts as the raw key it follows
+        return id(getattr(entry[0], 'source', entry[0])), entry[1]
+    
+    def slots(self):
+        """(heights id, key_idx) of every key this mapping reads"""
+        return {self._slot(entry) for table in self.TABLES for entry in getattr(self, table)}
+    
+    def overlaid(self, layer: 'PadMapping', taken) -> 'PadMapping':
+        """This mapping minus the keys in taken, plus everything in layer"""
+        merged = PadMapping()
+        for table in self.TABLES:
+            entries = [entry for entry in getattr(self, table) if self._slot(entry) not in taken]
+            entries.extend(getattr(layer, table))
+            setattr(merged, table, entries)
+        merged.socd = {**self.socd, **layer.socd}
+        merged.shaping = {**self.shaping, **layer.shaping}
+        return merged.build()
+
+
+class PredictedTravel(list):
+    """Predicted key heights, indexed like the raw list they follow"""
+    __slots__ = ('source',)
+
+
+class TravelPredictor:
+    """Extrapolates the tracked keys of one heights list a short horizon ahead
+    
+    Every tracked key keeps a small ring of recent travel sharing one ring of
+    scan times. The lead is the velocity across the ring times the horizon,
+    capped at max_lead, dropped when the last step runs against the trend or
+    the key is at rest, and the result is clamped to the travel range.
+    """
+    def __init__(self, source, horizon_ms: float = PREDICTION_HORIZON_MS,
+                 max_lead: float = PREDICTION_MAX_LEAD, history: int = PREDICTION_HISTORY):
+        self.source = source
+        self.heights = PredictedTravel(source)
+        self.heights.source = source
+        self.horizon = horizon_ms * 1e6     # ns
+        self.max_lead = max_lead
+        self.size = max(history, 2)
+        self._times = [0] * self.size
+        self._keys = []                     # (key_idx, travel ring)
+        self._pos = 0
+        self._count = 0
+    
+    def track(self, key_idx: int):
+        if all(idx != key_idx for idx, _ in self._keys):
+            self._keys.append((key_idx, [0] * self.size))
+    
+    def reset(self):
+        self._count = 0
+        for idx, _ in self._keys:
+            self.heights[idx] = self.source[idx]
+    
+    def update(self, now: int):
+        """Sample the source and refresh the predicted heights"""
+        size = self.size
+        pos = self._pos
+        times = self._times
+        times[pos] = now
+        count = self._count = min(self._count + 1, size)
+        oldest = (pos - count + 1) % size
+        prev = (pos - 1) % size
+        span = now - times[oldest]
+        scale = self.horizon / span if count > 1 and span > 0 else 0.0
+        max_lead = self.max_lead
+        source, heights = self.source, self.heights
+        
+        for idx, values in self._keys:
+            height = source[idx]
+            values[pos] = height
+            if not scale or height <= 0:
+                heights[idx] = height
+                continue
+            trend = height - values[oldest]
+            step = height - values[prev]
+            if step * trend < 0:
+                heights[idx] = height
+                continue
+            lead = max(-max_lead, min(max_lead, trend * scale))
+            heights[idx] = max(0.0, min(FULL_TRAVEL, height + lead))
+        self._pos = (pos + 1) % size
+
+
+class VirtualPad:
+    """A virtual Xbox 360 controller and the last report pushed to it"""
+    def __init__(self, name: str, gamepad):
+        self.name = name
+        self.gamepad = gamepad
+        self.mapping = PadMapping()
+        self.axes = [0.0] * len(AXES)
+        self.buttons = 0
+        self._sent_axes = [0.0] * len(AXES)
+        self._sent_buttons = 0
+        # Last two mapped frames, for the output clock
+        self._frame_axes = [0.0] * len(AXES)
+        self._prev_axes = [0.0] * len(AXES)
+        self._out_axes = [0.0] * len(AXES)
+        self._frame_time = 0
+        self._prev_time = 0
+    
+    def latch(self, now: int):
+        """Keep the freshly mapped axes for the output clock instead of sending them"""
+        self._prev_axes[:] = self._frame_axes
+        self._frame_axes[:] = self.axes
+        self._prev_time = self._frame_time
+        self._frame_time = now
+    
+    def tick(self, now: int, interpolate: bool) -> bool:
+        """Send one output-clock report, optionally blending the last two frames
+        
+        Interpolation runs one scan behind: at the moment a frame arrives the
+        output still shows the previous one and reaches the new one a scan later.
+        """
+        if not interpolate or not self._prev_time:
+            return self.send(self._frame_axes)
+        span = self._frame_time - self._prev_time
+        fraction = min((now - self._frame_time) / span, 1.0) if span > 0 else 1.0
+        prev, frame, out = self._prev_axes, self._frame_axes, self._out_axes
+        for i in range(len(out)):
+            out[i] = prev[i] + (frame[i] - prev[i]) * fraction
+        return self.send(out)
+    
+    def send(self, axes=None) -> bool:
+        """Push the report if it changed since the last one"""
+        axes = self.axes if axes is None else axes
+        sent = self._sent_axes
+        gamepad = self.gamepad
+        changed = False
+        
+        if axes[0] != sent[0] or axes[1] != sent[1]:
+            gamepad.left_joystick_float(axes[0], axes[1])
+            changed = True
+        if axes[2] != sent[2] or axes[3] != sent[3]:
+            gamepad.right_joystick_float(axes[2], axes[3])
+            changed = True
+        if axes[4] != sent[4]:
+            gamepad.left_trigger_float(axes[4])
+            changed = True
+        if axes[5] != sent[5]:
+            gamepad.right_trigger_float(axes[5])
+            changed = True
+        
+        buttons = self.buttons
+        diff = buttons ^ self._sent_buttons
+        if diff:
+            for bit in BUTTON_BITS:
+                if diff & bit:
+                    if buttons & bit:
+                        gamepad.press_button(bit)
+                    else:
+                        gamepad.release_button(bit)
+            changed = True
+        
+        if changed:
+            gamepad.update()
+            sent[:] = axes
+            self._sent_buttons = buttons
+        return changed
+    
+    def neutral(self):
+        """Release everything on the pad"""
+        for i in range(len(self.axes)):
+            self.axes[i] = 0.0
+            self._sent_axes[i] = 0.0
+            self._frame_axes[i] = 0.0
+            self._prev_axes[i] = 0.0
+        self._frame_time = self._prev_time = 0
+        self.buttons = 0
+        self._sent_buttons = 0
+        self.gamepad.reset()
+        self.gamepad.update()
+
+
+class CompiledProfile:
+    """A profile's mappings compiled against the connected boards and pads"""
+    def __init__(self, name: str, path: Optional[str]):
+        self.name = name
+        self.path = path
+        self.mappings = {}                  # pad name -> PadMapping
+        self.suppressed_keys = frozenset()  # keyboard module names
+        self.scan_codes = frozenset()
+        self.processes = ()                 # executables that auto-select this profile
+        self.layers = []                    # CompiledLayer
+        self.layer_stack = []               # active layers, most recent last
+        self.watched = ()                   # (raw heights, key_idx) of every key it reads
+
+
+class CompiledLayer:
+    """A layer's full per-pad tables: the base mappings with the layer's keys overlaid"""
+    def __init__(self, name: str, mode: str, heights, key_idx: int):
+        self.name = name
+        self.mode = mode        # "hold" or "toggle"
+        self.heights = heights
+        self.key_idx = key_idx
+        self.mappings = {}      # pad name -> PadMapping
+        self.held = False
+
+
+class ProfileCache:
+    """LRU of compiled profiles keyed by config path"""
+    def __init__(self, capacity: int = PROFILE_CACHE_SIZE):
+        self.capacity = capacity
+        self._profiles = OrderedDict()
+    
+    def get(self, path) -> Optional[CompiledProfile]:
+        profile = self._profiles.get(path)
+        if profile is not None:
+            self._profiles.move_to_end(path)
+        return profile
+    
+    def put(self, profile: CompiledProfile):
+        self._profiles[profile.path] = profile
+        self._profiles.move_to_end(profile.path)
+        while len(self._profiles) > self.capacity:
+            self._profiles.popitem(last=False)
+    
+    def clear(self):
+        self._profiles.clear()
+    
+    def __len__(self):
+        return len(self._profiles)
+
+
+class ForegroundProcessSource:
+    """Foreground window's process through user32/kernel32 (Windows only)"""
+    PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+    
+    def __init__(self):
+        self._user32 = ctypes.windll.user32
+        self._kernel32 = ctypes.windll.kernel32
+    
+    def foreground(self) -> int:
+        """Process id owning the foreground window; two cheap user32 calls"""
+        pid = ctypes.c_ulong(0)
+        window = self._user32.GetForegroundWindow()
+        if window:
+            self._user32.GetWindowThreadProcessId(window, ctypes.byref(pid))
+        return pid.value
+    
+    def executable(self, pid: int) -> Optional[str]:
+        """Full executable path of a process"""
+        handle = self._kernel32.OpenProcess(self.PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+        if not handle:
+            return None
+        try:
+            buffer = ctypes.create_unicode_buffer(1024)
+            size = ctypes.c_ulong(len(buffer))
+            if self._kernel32.QueryFullProcessImageNameW(handle, 0, buffer, ctypes.byref(size)):
+                return buffer.value
+            return None
+        finally:
+            self._kernel32.CloseHandle(handle)
+
+
+class ForegroundWatcher:
+    """Maps the foreground process to a profile path.
+
+    source needs foreground() -> pid and executable(pid) -> path. Only a pid
+    change triggers a lookup, and executables are cached per pid, so a poll
+    with no focus change costs one foreground() call.
+    """
+    MAX_CACHED_PROCESSES = 256
+    
+    def __init__(self, source, rules: dict, on_match):
+        self.source = source
+        self.rules = {name.lower(): path for name, path in rules.items()}
+        self.on_match = on_match
+        self._last_pid = None
+        self._executables = {}
+    
+    def match(self, executable: Optional[str]) -> Optional[str]:
+        """Profile for a full executable path or bare process name"""
+        if not executable:
+            return None
+        executable = executable.lower()
+        profile = self.rules.get(executable)
+        if profile is None:
+            profile = self.rules.get(os.path.basename(executable.replace('\\', '/')))
+        return profile
+    
+    def poll(self):
+        """Check the foreground process and report a matching profile once per focus change"""
+        pid = self.source.foreground()
+        if pid == self._last_pid:
+            return
+        self._last_pid = pid
+        
+        executable = self._executables.get(pid)
+        if executable is None:
+            executable = self.source.executable(pid) or ""
+            if len(self._executables) >= self.MAX_CACHED_PROCESSES:
+                self._executables.clear()
+            self._executables[pid] = executable
+        
+        profile = self.match(executable)
+        if profile is not None:
+            self.on_match(profile)
+
+
+class ProfileCatalog:
+    """Searchable index of the profiles in a directory.
+
+    Each profile is indexed by game, description and content hash. The index
+    is persisted to CATALOG_FILE so a rescan only re-parses files whose mtime
+    or size changed.
+    """
+    def __init__(self, directory: str, cache_file: str = CATALOG_FILE):
+        self.directory = os.path.abspath(directory)
+        self.cache_file = cache_file
+        self.entries = {}   # path -> entry dict
+        self._index = []    # (path, entry, lowercase search text), sorted by game
+    
+    def _load_cache(self) -> dict:
+        try:
+            with open(self.cache_file, 'r') as f:
+                return json.load(f).get(self.directory, {})
+        except (OSError, ValueError):
+            return {}
+    
+    def _save_cache(self):
+        try:
+            with open(self.cache_file, 'r') as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            cache = {}
+        cache[self.directory] = self.entries
+        with open(self.cache_file, 'w') as f:
+            json.dump(cache, f)
+    
+    @staticmethod
+    def _index_file(path: str, stat) -> dict:
+        """Parse one file into a catalog entry"""
+        entry = {'mtime': stat.st_mtime_ns, 'size': stat.st_size,
+                 'game': None, 'description': "", 'hash': None}
+        try:
+            with open(path, 'rb') as f:
+                content = f.read()
+            entry['hash'] = hashlib.sha1(content).hexdigest()
+            config = json.loads(content)
+        except (OSError, ValueError):
+            return entry
+        if isinstance(config, dict) and 'controller_mappings' in config:
+            entry['game'] = config.get('game') or os.path.splitext(os.path.basename(path))[0]
+            entry['description'] = config.get('description', "")
+        return entry
+    
+    def scan(self) -> int:
+        """Refresh the index; returns how many files had to be parsed"""
+        cached = self._load_cache() if not self.entries else self.entries
+        entries = {}
+        parsed = 0
+        with os.scandir(self.directory) as it:
+            for item in it:
+                if not item.name.lower().endswith('.json') or not item.is_file():
+                    continue
+                if item.name in (SETTINGS_FILE, CATALOG_FILE):
+                    continue
+                stat = item.stat()
+                entry = cached.get(item.path)
+                if entry is None or entry['mtime'] != stat.st_mtime_ns or entry['size'] != stat.st_size:
+                    entry = self._index_file(item.path, stat)
+                    parsed += 1
+                entries[item.path] = entry
+        
+        changed = parsed or len(entries) != len(cached)
+        self.entries = entries
+        self._index = sorted(
+            ((path, entry, f"{entry['game']} {entry['description']} {os.path.basename(path)}".lower())
+             for path, entry in entries.items() if entry['game']),
+            key=lambda item: (item[1]['game'].lower(), item[0]))
+        if changed:
+            try:
+                self._save_cache()
+            except OSError:
+                pass
+        return parsed
+    
+    def profiles(self):
+        """(path, entry) for every file that is a DD2RL profile, sorted by game"""
+        return [(path, entry) for path, entry, _ in self._index]
+    
+    def search(self, query: str):
+        """Profiles whose game, description or file name contain every word of query"""
+        words = query.lower().split()
+        return [(path, entry) for path, entry, haystack in self._index
+                if all(word in haystack for word in words)]
+    
+    def duplicates(self):
+        """Groups of profile paths with identical content"""
+        by_hash = {}
+        for path, entry in self.profiles():
+            by_hash.setdefault(entry['hash'], []).append(path)
+        return [paths for paths in by_hash.values() if len(paths) > 1]
+
+
+def enumerate_keyboards():
+    """Raw-data HID interfaces of every connected DrunkDeer board"""
+    keyboards = []
+    for dev in hid.enumerate(VENDOR_ID, 0):
+        if dev['product_id'] not in PRODUCT_MODELS:
+            continue
+        if dev['usage_page'] == 0xFF00 and dev['usage'] == HID_USAGE:
+            keyboards.append(dev)
+    return keyboards
+
+
+class RealtimeMode:
+    """Raises the calling thread's priority, optionally pins it to one CPU and
+    asks for 1 ms timers; restore() undoes it and must run on the same thread
+    """
+    def __init__(self, cpu: Optional[int] = None, nice: int = REALTIME_NICE):
+        self.cpu = cpu
+        self.nice = nice
+        self.applied = []
+        self.failed = []
+        self._undo = []
+    
+    def apply(self):
+        if sys.platform == 'win32':
+            self._apply_windows()
+        else:
+            self._apply_posix()
+        return self
+    
+    def _apply_posix(self):
+        tid = threading.get_native_id()
+        if self.cpu is not None and hasattr(os, 'sched_setaffinity'):
+            try:
+                previous = os.sched_getaffinity(tid)
+                os.sched_setaffinity(tid, {self.cpu})
+                self._undo.append(lambda: os.sched_setaffinity(tid, previous))
+                self.applied.append(f"CPU {self.cpu}")
+            except OSError as e:
+                self.failed.append(f"CPU {self.cpu}: {e.strerror}")
+        if hasattr(os, 'setpriority'):
+            try:
+                previous = os.getpriority(os.PRIO_PROCESS, tid)
+                os.setpriority(os.PRIO_PROCESS, tid, self.nice)
+                self._undo.append(lambda: os.setpriority(os.PRIO_PROCESS, tid, previous))
+                self.applied.append(f"nice {self.nice}")
+            except OSError as e:
+                self.failed.append(f"nice {self.nice}: {e.strerror}")
+    
+    def _apply_windows(self):
+        kernel32 = ctypes.windll.kernel32
+        thread = kernel32.GetCurrentThread()
+        previous = kernel32.GetThreadPriority(thread)
+        if kernel32.SetThreadPriority(thread, 2):     # THREAD_PRIORITY_HIGHEST
+            self._undo.append(lambda: kernel32.SetThreadPriority(thread, previous))
+            self.applied.append("high priority")
+        else:
+            self.failed.append("thread priority")
+        if self.cpu is not None:
+            mask = kernel32.SetThreadAffinityMask(thread, 1 << self.cpu)
+            if mask:
+                self._undo.append(lambda: kernel32.SetThreadAffinityMask(thread, mask))
+                self.applied.append(f"CPU {self.cpu}")
+            else:
+                self.failed.append(f"CPU {self.cpu}")
+        winmm = ctypes.windll.winmm
+        if winmm.timeBeginPeriod(1) == 0:
+            self._undo.append(lambda: winmm.timeEndPeriod(1))
+            self.applied.append("1 ms timers")
+    
+    def restore(self):
+        while self._undo:
+            try:
+                self._undo.pop()()
+            except Exception:
+                pass
+
+
+class StackSampler:
+    """Samples one thread's Python stack from a helper thread
+    
+    sys._current_frames() is read for that thread alone, so other threads
+    never show up, whatever the Python version (cProfile covers every thread
+    from 3.12 on). Stacks are counted in collapsed form, root first, as
+    flame graph tools read them.
+    """
+    def __init__(self, ident: int, interval: float = PROFILE_SAMPLE_INTERVAL):
+        self.ident = ident
+        self.interval = interval
+        self.stacks = {}        # "root;...;leaf" -> samples
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+    
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+    
+    def _run(self):
+        while not self._stop.is_set():
+            frame = sys._current_frames().get(self.ident)
+            if frame is not None:
+                names = []
+                while frame is not None:
+                    code = frame.f_code
+                    names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack = ";".join(reversed(names))
+                self.stacks[stack] = self.stacks.get(stack, 0) + 1
+                self.samples += 1
+            time.sleep(self.interval)
+    
+    def hottest(self, count: int = 3):
+        """(function, share of samples) for the functions most often on top of the stack"""
+        leaves = {}
+        for stack, samples in self.stacks.items():
+            leaf = stack.rsplit(";", 1)[-1]
+            leaves[leaf] = leaves.get(leaf, 0) + samples
+        ranked = sorted(leaves.items(), key=lambda item: item[1], reverse=True)[:count]
+        return [(leaf, samples / self.samples) for leaf, samples in ranked]
+    
+    def save(self, path: str):
+        with open(path, 'w') as f:
+            for stack, samples in sorted(self.stacks.items()):
+                f.write(f"{stack} {samples}\n")
+
+
+class GapRing:
+    """Fixed-size ring of the latest frame gaps, allocated once
+    
+    Gaps are stored as raw doubles so recording one creates no object.
+    """
+    def __init__(self, size: int = JITTER_WINDOW):
+        self._values = array('d', bytes(8 * size))
+        self._pos = 0
+        self._count = 0
+    
+    def add(self, gap: float):
+        self._values[self._pos] = gap
+        self._pos = (self._pos + 1) % len(self._values)
+        if self._count < len(self._values):
+            self._count += 1
+    
+    def values(self):
+        return self._values[:self._count].tolist()
+    
+    def clear(self):
+        self._pos = self._count = 0
+    
+    def __len__(self):
+        return self._count
+
+
+def jitter_p99(gaps) -> float:
+    """99th percentile distance of frame gaps from their median, in ms"""
+    if len(gaps) < 2:
+        return 0.0
+    ordered = sorted(gaps)
+    median = ordered[len(ordered) // 2]
+    deviations = sorted(abs(gap - median) for gap in gaps)
+    return deviations[int(0.99 * (len(deviations) - 1))] * 1000
+
+
+PARSE, MAP, FILTER, OUTPUT = range(4)
+# parse: HID packets into key travel; map: controls, merging boards and mappings;
+# filter: travel prediction and stick shaping; output: the report to the pad
+FRAME_STAGES = ('parse', 'map', 'filter', 'output')
+# Optional work the watchdog gives up first when frames slip, and what it covers
+SHED_ORDER = (('interpolation', "output interpolation"),
+              ('prediction', "travel prediction"))
+
+
+class FrameWatchdog:
+    """Times each frame's stages against a budget and sheds optional work while frames slip
+    
+    After WATCHDOG_OVERRUNS frames over budget in a row it reports the stage
+    that took longest and, with shedding on, drops the next stage of
+    SHED_ORDER. Each later run of `recover` frames within budget brings the
+    most recently shed stage back.
+    """
+    def __init__(self, budget: float, shed: bool = False, overruns: int = WATCHDOG_OVERRUNS,
+                 recover: int = WATCHDOG_RECOVER):
+        self.budget = int(budget * 1e9)     # ns
+        self.shedding = shed
+        self.overrun_limit = max(overruns, 1)
+        self.recover = max(recover, 1)
+        self.stages = [0] * len(FRAME_STAGES)   # ns spent per stage in the current frame
+        self.shed = set()
+        self.frames = 0
+        self.overruns = 0
+        self._shed_order = []
+        self._streak = 0
+        self._calm = 0
+        self._quiet_until = 0               # no repeat report before this frame unless shedding
+    
+    def begin(self):
+        stages = self.stages
+        for i in range(len(stages)):
+            stages[i] = 0
+    
+    def end(self, elapsed: int) -> Optional[str]:
+        """Close the frame; returns a line for the log when the watchdog acted"""
+        stages = self.stages
+        stages[MAP] = elapsed - stages[PARSE] - stages[FILTER] - stages[OUTPUT]
+        self.frames += 1
+        if elapsed <= self.budget:
+            self._streak = 0
+            self._calm += 1
+            if self._shed_order and self._calm >= self.recover:
+                self._calm = 0
+                stage, label = self._shed_order.pop()
+                self.shed.discard(stage)
+                return f"✓ Frames back within budget, restored {label}"
+            return None
+        
+        self.overruns += 1
+        self._calm = 0
+        self._streak += 1
+        if self._streak < self.overrun_limit:
+            return None
+        self._streak = 0
+        action = ""
+        if self.shedding:
+            for stage, label in SHED_ORDER:
+                if stage not in self.shed:
+                    self.shed.add(stage)
+                    self._shed_order.append((stage, label))
+                    action = f", shedding {label}"
+                    break
+        if not action:
+            if self.frames < self._quiet_until:
+                return None
+            self._quiet_until = self.frames + self.recover
+        slowest = max(range(len(stages)), key=stages.__getitem__)
+        message = (f"⚠ {self.overrun_limit} frames over the {self.budget / 1e6:.2f} ms budget, "
+                   f"last took {elapsed / 1e6:.2f} ms ({FRAME_STAGES[slowest]} {stages[slowest] / 1e6:.2f} ms)")
+        return message + action
+
+
+class KeyboardReader:
+    """One opened board: HID handle, detected layout and its own frame assembler"""
+    def __init__(self, name: str, device, product_id: Optional[int] = None,
+                 path: Optional[str] = None, serial: Optional[str] = None):
+        self.name = name
+        self.device = device
+        self.product_id = product_id
+        self.path = path
+        self.serial = serial
+        self.model = None
+        self.firmware = None
+        self.layout = get_layout(DEFAULT_MODEL)
+        self.assembler = FrameAssembler()
+        self.thread: Optional[threading.Thread] = None
+        self.poll_interval: Optional[float] = None    # tuned by --probe-hid, else the controller's
+        self.last_frame = 0.0
+        self.discarded = 0      # stale scans dropped by drain_backlog
+        # Idle polling: whether the board is on the slow rate, and how waking up went
+        self.idle = False
+        self.last_active = 0.0
+        self.wakes = 0
+        self.wake_latency_total = 0.0
+        self.wake_latency_max = 0.0
+    
+    def identify(self):
+        """Ask the board who it is and load the matching layout"""
+        self.device.write([0x04, 0xa0, 0x02])
+        time.sleep(0.1)
+        reply = self.device.read(65, timeout_ms=1000)
+        self.model, self.firmware = identify_keyboard(reply, self.product_id)
+        self.layout = get_layout(self.model, self.firmware)
+    
+    def close(self):
+        """Release the HID handle"""
+        if self.device:
+            try:
+                self.device.close()
+            except Exception:
+                pass
+            self.device = None
+
+
 class DrunkDeerController:
     def __init__(self):
-        self.device: Optional[hid.device] = None
-        self.gamepad: Optional[vg.VX360Gamepad] = None
+        self.readers = []
+        self.pads = []
         self.running = False
+        self.simulate = False
         self.controller_enabled = True
         self.suppression_enabled = False
         self.suppressed_keys = set()
+        self.suppressor = KeyboardSuppressor()
         self.toggle_key = "f12"
-        
-        self.key_heights = [0] * 128
+        self.toggle_source = "hook"
+        self.toggle_callback = None
+
+        # Stop wakes the reader out of its inter-frame wait immediately
+        self._stop_event = threading.Event()
+        self._suppression_lock = threading.Lock()
+        self._stop_requested_at = 0.0
+        self.shutdown_latency_ms = 0.0
+        
+        # Unqualified mappings read key_heights: the primary board's frame, or
+        # the merge of all boards when more than one is configured
+        self.assembler = FrameAssembler()
+        self.key_heights = self.assembler.key_heights
+        self.merge_frames = False
+        self._boards = {}
+        self._frame_lock = threading.RLock()
         self.config = {}
-        self.key_name_to_index = self._build_key_map()
+        self.config_path = None
+        self.layout = get_layout(DEFAULT_MODEL)
+        self.key_name_to_index = self.layout.name_to_index
+        self.model = None
+        self.firmware = None
+        
+        # Profiles are compiled ahead of time; switching swaps pad.mapping pointers
+        self.profile_cache = ProfileCache()
+        self.profile: Optional[CompiledProfile] = None
+        self.profile_paths = []
+        self._pending_profile = None
+        self._log = print
+        self.auto_switch_rules = {}
+        self.process_source = None
+        self.scheduler = MacroScheduler()
+        
+        # Analog keys can read predicted travel (config 'prediction'); capture_path
+        # records the scanned frames for evaluate_prediction
+        self.prediction = None
+        self.predictors = {}                # id(raw heights) -> TravelPredictor
+        self.capture_path = None
+        self._capture = None
+        
+        # Opt-in thread priority/affinity for the reader and output threads
+        self.realtime = False
+        self.realtime_cpu: Optional[int] = None
+        self.realtime_args = {}             # from the command line; wins over the config
+        self.frame_gaps = GapRing()
+        
+        # Garbage collection while running: see GC_MODES, 'gc' in the config
+        self.gc_mode = 'default'
+        self._gc_was_enabled = True
+        self.frames = 0
+        self._merge_sources = self._merge_rest = ()
+        
+        # After a stall, skip queued scans and map only the newest
+        self.drain_backlog = False
+        
+        # Slower polling while disabled or untouched (0 keeps the full rate)
+        self.idle_poll_interval = 0.0
+        self.idle_after = IDLE_AFTER
+        
+        # 0 sends one report per scan; otherwise a separate clock sends at this rate
+        self.output_rate_hz = 0
+        self.interpolate = False
+        self._output_thread = None
+        self._output_started = 0
+        self.output_ticks = 0
+        self._watcher_thread: Optional[threading.Thread] = None
         
         self.deadzone_min = 2
         self.deadzone_max = 40
         self.poll_interval = 0.005
         
-    def _build_key_map(self) -> Dict[str, int]:
-        """Build keyboard layout mapping"""
-        layout = [
-            "u0", "ESC", "F1", "F2", "F3", "F4", "F5", "F6", "F7", "F8",
-            "F9", "F10", "F11", "F12", "PRTSCN", "INS", "DEL", "KP9", "u2", "u3", "u4", "u5",
-            "SWUNG", "1", "2", "3", "4", "5", "6", "7", "8", "9", "0",
-            "MINUS", "PLUS", "BACK", "KP4", "HOME", "KP6", "u6", "u7", "u8", "u9",
-            "TAB", "Q", "W", "E", "R", "T", "Y", "U", "I", "O", "P",
-            "BRKTS_L", "BRKTS_R", "SLASH_K29", "KP1", "PGUP", "KP3", "u10", "u11", "u12", "u13",
-            "CAPS", "A", "S", "D", "F", "G", "H", "J", "K", "L",
-            "COLON", "QOTATN", "u14", "RETURN", "u15", "PGDN", "KP_DEL", "u16", "u17", "u18", "u19",
-            "SHF_L", "EUR_K45", "Z", "X", "C", "V", "B", "N", "M",
-            "COMMA", "PERIOD", "VIRGUE", "u20", "SHF_R", "ARR_UP", "u21", "NUMS", "u22", "u23", "u24", "u25",
-            "END", "WIN_L", "ALT_L", "u26", "u27", "u28", "SPACE",
-            "u29", "u30", "u31", "ALT_R", "FN1", "APP", "u32", "ARR_L",
-            "ARR_DW", "ARR_R", "CTRL_R", "u33", "u34", "u35", "u36"
-        ]
-        return {name: idx for idx, name in enumerate(layout) if not name.startswith("u")}
+        # Per-stage frame timing against a budget; see FrameWatchdog
+        self.watchdog = FrameWatchdog(self.poll_interval * WATCHDOG_BUDGET)
+        
+        # Stack samples of the main reader thread; a request starts on its next scan
+        self.profiling_seconds = 0.0        # seconds
+        self._profiler = None
+        self._profile_until = 0.0
+        
+    def set_model(self, model: str, firmware: Optional[str] = None):
+        """Switch to the layout table for the connected model"""
+        self.model = model
+        self.firmware = firmware
+        self.layout = get_layout(model, firmware)
+        self.key_name_to_index = self.layout.name_to_index
+    
+    def unresolved_keys(self, config: Optional[dict] = None):
+        """Mapped drunkdeer_key names missing from the layout they resolve against"""
+        missing = []
+        config = self.config if config is None else config
+        for section in MAPPING_SECTIONS:
+            for mapping in config.get('controller_mappings', {}).get(section, {}).values():
+                heights, key_idx = self._mapping_source(mapping)
+                if key_idx is None:
+                    board = mapping.get('keyboard')
+                    missing.append(f"{board}:{mapping.get('drunkdeer_key')}" if board
+                                   else str(mapping.get('drunkdeer_key')))
+        return missing
+    
+    def _mapping_source(self, mapping):
+        """Key heights list and slot a mapping reads from"""
+        heights, name_to_index = self.key_heights, self.key_name_to_index
+        board = mapping.get('keyboard')
+        if board is not None:
+            reader = self._boards.get(board)
+            if reader is None:
+                return heights, None
+            heights, name_to_index = reader.assembler.key_heights, reader.layout.name_to_index
+        
+        key_idx = mapping.get('drunkdeer_index')
+        if key_idx is None:
+            key_idx = name_to_index.get(mapping.get('drunkdeer_key'))
+        return heights, key_idx
+    
+    def resolve_key_index(self, key_name: str, layout: Optional[KeyboardLayout] = None) -> Optional[int]:
+        """Find the layout slot for a DrunkDeer or keyboard module key name"""
+        name_to_index = (layout or self.layout).name_to_index
+        idx = name_to_index.get(key_name.upper())
+        if idx is None:
+            for drunkdeer_key, kb_name in KEYBOARD_KEY_NAMES.items():
+                if kb_name == key_name.lower():
+                    idx = name_to_index.get(drunkdeer_key)
+                    break
+        return idx
+    
+    def _setup_control_keys(self, reader: KeyboardReader, log_callback):
+        """Watch configured control keys in the HID frames instead of an OS hook"""
+        controls = []
+        if self.toggle_source == "hid":
+            controls.append((self.toggle_key, self._hid_toggle))
+        
+        cycle_key = self.config.get('profile_cycle_key')
+        if cycle_key and len(self.profile_paths) > 1:
+            controls.append((cycle_key, self.cycle_profile))
+        for entry, path in zip(self._profile_entries(), self.profile_paths[1:]):
+            if entry.get('key'):
+                controls.append((entry['key'], lambda path=path: self.switch_profile(path)))
+        
+        reader.assembler.control_keys = []
+        for key_name, action in controls:
+            idx = self.resolve_key_index(key_name, reader.layout)
+            if idx is None:
+                log_callback(f"⚠ Control key {key_name.upper()} is not on the {reader.model} layout")
+                continue
+            reader.assembler.control_keys.append(ControlKey(idx, action))
+    
+    def _hid_toggle(self):
+        """Toggle from the controller thread, between frames"""
+        self.toggle_suppression()
+        if self.toggle_callback:
+            self.toggle_callback()
+    
+    def _profile_entries(self):
+        """The 'profiles' list, with bare paths expanded to {'path': ...}"""
+        entries = []
+        for entry in self.config.get('profiles', []):
+            entries.append({'path': entry} if isinstance(entry, str) else entry)
+        return entries
+    
+    def _profile_path(self, path: str) -> str:
+        """Resolve a profile path relative to the main config"""
+        base = os.path.dirname(self.config_path) if self.config_path else os.getcwd()
+        return os.path.abspath(os.path.join(base, path))
+    
+    def _compile_mappings(self, mappings: dict, log_callback) -> dict:
+        """Resolve a controller_mappings section into {pad name: PadMapping}"""
+        compiled = {pad.name: PadMapping() for pad in self.pads}
+        socd = {}
+        for axis_name, mode in mappings.get('socd', {}).items():
+            if axis_name not in AXES[:LEFT_TRIGGER_AXIS] or mode not in SOCD_MODES:
+                log_callback(f"⚠ socd: ignoring {axis_name} = {mode}")
+                continue
+            socd[AXES.index(axis_name)] = mode
+        shaping = {}
+        for stick, shape in mappings.get('sticks', {}).items():
+            if stick not in STICKS:
+                log_callback(f"⚠ sticks: unknown stick {stick}")
+                continue
+            shaping[stick] = StickShape.from_config(stick, shape)
+        for pad_mapping in compiled.values():
+            pad_mapping.socd = socd
+            pad_mapping.shaping = shaping
+        
+        for section in MAPPING_SECTIONS:
+            for action, mapping in mappings.get(section, {}).items():
+                pad_mapping = compiled.get(mapping.get('pad', self.pads[0].name))
+                if pad_mapping is None:
+                    log_callback(f"⚠ {action}: no pad named '{mapping.get('pad')}'")
+                    continue
+                
+                heights, key_idx = self._mapping_source(mapping)
+                if key_idx is None or key_idx >= len(heights):
+                    continue
+                
+                controller_action = mapping.get('controller', '')
+                if section == 'macros':
+                    macro = Macro.from_mapping(mapping)
+                    if macro is None:
+                        log_callback(f"⚠ {action}: macro needs steps or a turbo button it knows")
+                        continue
+                    pad_mapping.macros.append((heights, key_idx, macro))
+                elif section == 'analog':
+                    heights = self._analog_source(heights, key_idx)
+                    for target_name, weight in mapping.get('mix', {}).items():
+                        target = analog_target(target_name)
+                        if target is None:
+                            log_callback(f"⚠ {action}: unknown mix target {target_name}")
+                            continue
+                        axis, sign = target
+                        pad_mapping.mixes.append((heights, key_idx, axis, sign * float(weight)))
+                    
+                    target = analog_target(controller_action)
+                    if target is None:
+                        continue
+                    axis, sign = target
+                    if axis in (LEFT_TRIGGER_AXIS, RIGHT_TRIGGER_AXIS):
+                        pad_mapping.triggers.append((heights, key_idx, axis))
+                    else:
+                        pad_mapping.sticks.append((heights, key_idx, axis, sign))
+                elif 'tap' in mapping or 'shallow' in mapping:
+                    dual = DualState.from_mapping(mapping)
+                    if dual is None:
+                        log_callback(f"⚠ {action}: tap/hold and shallow/deep need two known buttons")
+                        continue
+                    pad_mapping.duals.append((heights, key_idx, dual))
+                elif controller_action in BUTTONS:
+                    pad_mapping.buttons.append((heights, key_idx, int(BUTTONS[controller_action]),
+                                                ButtonState.from_mapping(mapping)))
+        for pad_mapping in compiled.values():
+            pad_mapping.build()
+        return compiled
+    
+    def _analog_source(self, heights, key_idx: int):
+        """Predicted travel for an analog key when prediction is on, else the raw heights"""
+        if not self.prediction:
+            return heights
+        predictor = self.predictors.get(id(heights))
+        if predictor is None:
+            predictor = self.predictors[id(heights)] = TravelPredictor(
+                heights, self.prediction.get('horizon_ms', PREDICTION_HORIZON_MS),
+                self.prediction.get('max_lead', PREDICTION_MAX_LEAD),
+                self.prediction.get('history', PREDICTION_HISTORY))
+        predictor.track(key_idx)
+        return predictor.heights
+    
+    def compile_profile(self, path: Optional[str], log_callback) -> CompiledProfile:
+        """Load a profile and resolve its mappings (and layers) into per-pad flat tables"""
+        if path is None or path == self.config_path:
+            config = self.config
+        else:
+            with open(path, 'r') as f:
+                config = json.load(f)
+        
+        profile = CompiledProfile(config.get('game') or os.path.basename(path or "config"), path)
+        profile.mappings = self._compile_mappings(config.get('controller_mappings', {}), log_callback)
+        suppressed = self._mapped_keyboard_keys(config)
+        
+        for name, layer_config in config.get('layers', {}).items():
+            heights, key_idx = self._mapping_source(layer_config)
+            if key_idx is None:
+                log_callback(f"⚠ Layer {name}: key {layer_config.get('drunkdeer_key')} not found")
+                continue
+            
+            layer = CompiledLayer(name, layer_config.get('mode', 'hold'), heights, key_idx)
+            overlay = self._compile_mappings(layer_config.get('controller_mappings', {}), log_callback)
+            taken = set()
+            for pad_mapping in overlay.values():
+                taken |= pad_mapping.slots()
+            for pad_name, base in profile.mappings.items():
+                layer.mappings[pad_name] = base.overlaid(overlay[pad_name], taken)
+            profile.layers.append(layer)
+            
+            suppressed |= self._mapped_keyboard_keys(layer_config)
+            if layer_config.get('drunkdeer_key'):
+                suppressed.add(self._convert_key_name(layer_config['drunkdeer_key']))
+        
+        slots = {}
+        for tables in [profile.mappings] + [layer.mappings for layer in profile.layers]:
+            for pad_mapping in tables.values():
+                for table in PadMapping.TABLES:
+                    for entry in getattr(pad_mapping, table):
+                        source = getattr(entry[0], 'source', entry[0])
+                        slots[(id(source), entry[1])] = (source, entry[1])
+        for layer in profile.layers:
+            slots[(id(layer.heights), layer.key_idx)] = (layer.heights, layer.key_idx)
+        profile.watched = tuple(slots.values())
+        
+        profile.processes = tuple(config.get('processes', ()))
+        profile.suppressed_keys = frozenset(suppressed)
+        profile.scan_codes = KeyboardSuppressor.resolve(profile.suppressed_keys)
+        return profile
+    
+    def _prepare_profiles(self, log_callback):
+        """Compile the main config and every listed profile up front"""
+        self.profile_cache.clear()
+        self.profile_paths = [self.config_path]
+        self.profile_paths.extend(self._profile_path(entry['path']) for entry in self._profile_entries())
+        self.profile_cache.capacity = max(self.config.get('profile_cache_size', PROFILE_CACHE_SIZE), 1)
+        
+        # Every profile is compiled once so its 'processes' are known; the
+        # cache then keeps the most recent profile_cache_size of them
+        self.auto_switch_rules = {}
+        for path in reversed(self.profile_paths):
+            try:
+                profile = self.compile_profile(path, log_callback)
+            except Exception as e:
+                log_callback(f"⚠ Could not load profile {path}: {e}")
+                continue
+            self.profile_cache.put(profile)
+            for process in profile.processes:
+                self.auto_switch_rules[process] = path
+        
+        self.activate_profile(self.profile_cache.get(self.config_path)
+                              or self.compile_profile(self.config_path, log_callback))
+        if len(self.profile_paths) > 1:
+            log_callback(f"✓ {len(self.profile_cache)} profiles ready")
+    
+    def activate_profile(self, profile: CompiledProfile):
+        """Swap every pad to the profile's tables; O(pads), no recompiling"""
+        with self._frame_lock:
+            for layer in profile.layers:
+                layer.held = False
+            profile.layer_stack = []
+            self.scheduler.clear()
+            for tables in [profile.mappings] + [layer.mappings for layer in profile.layers]:
+                for mapping in tables.values():
+                    for _, _, macro in mapping.macros:
+                        macro.reset()
+            self.profile = profile
+            self._apply_layers()
+            self.suppressed_keys = profile.suppressed_keys
+        with self._suppression_lock:
+            self.suppressor.set_scan_codes(profile.scan_codes)
+    
+    def _apply_layers(self):
+        """Point every pad at the most recently activated layer, or the base tables"""
+        profile = self.profile
+        tables = profile.layer_stack[-1].mappings if profile.layer_stack else profile.mappings
+        for pad in self.pads:
+            pad.mapping = tables.get(pad.name) or PadMapping()
+    
+    def _update_layers(self):
+        """Edge-detect layer keys in the current frame; a change is a pointer swap"""
+        profile = self.profile
+        changed = False
+        for layer in profile.layers:
+            height = layer.heights[layer.key_idx]
+            if layer.held:
+                if height <= CONTROL_RELEASE_TRAVEL:
+                    layer.held = False
+                    if layer.mode == 'hold' and layer in profile.layer_stack:
+                        profile.layer_stack.remove(layer)
+                        changed = True
+            elif height >= CONTROL_PRESS_TRAVEL:
+                layer.held = True
+                if layer in profile.layer_stack:
+                    if layer.mode == 'toggle':
+                        profile.layer_stack.remove(layer)
+                else:
+                    profile.layer_stack.append(layer)
+                changed = True
+        if changed:
+            self._apply_layers()
+    
+    def switch_profile(self, path: str) -> bool:
+        """Activate a profile from the cache, compiling it on a miss"""
+        profile = self.profile_cache.get(path)
+        if profile is None:
+            try:
+                profile = self.compile_profile(path, self._log)
+            except Exception as e:
+                self._log(f"⚠ Could not load profile {path}: {e}")
+                return False
+            self.profile_cache.put(profile)
+        
+        self.activate_profile(profile)
+        self._log(f"✓ Profile: {profile.name}")
+        return True
+    
+    def cycle_profile(self):
+        """Activate the next profile in the configured order"""
+        if not self.profile_paths:
+            return
+        current = self.profile.path if self.profile else None
+        idx = self.profile_paths.index(current) + 1 if current in self.profile_paths else 0
+        self.switch_profile(self.profile_paths[idx % len(self.profile_paths)])
+    
+    def request_profile(self, path: str):
+        """Ask the controller thread to switch profile before the next frame"""
+        self._pending_profile = path
+    
+    def _auto_switch(self, path: str):
+        """Foreground watcher callback"""
+        if self.profile is None or self.profile.path != path:
+            self.request_profile(path)
+    
+    def _start_watcher(self, log_callback):
+        """Follow the foreground process if any profile lists 'processes'"""
+        if not self.auto_switch_rules:
+            return
+        
+        source = self.process_source
+        if source is None:
+            try:
+                source = ForegroundProcessSource()
+            except (AttributeError, OSError):
+                log_callback("⚠ Automatic profile switching is only available on Windows")
+                return
+        
+        watcher = ForegroundWatcher(source, self.auto_switch_rules, self._auto_switch)
+        interval = max(self.config.get('auto_switch_interval_ms', AUTO_SWITCH_INTERVAL * 1000), 50) / 1000.0
+        
+        def watch():
+            while not self._stop_event.wait(interval):
+                try:
+                    watcher.poll()
+                except Exception as e:
+                    log_callback(f"⚠ Foreground watcher stopped: {e}")
+                    return
+        
+        self._watcher_thread = threading.Thread(target=watch, daemon=True)
+        self._watcher_thread.start()
+        log_callback(f"✓ Following {len(self.auto_switch_rules)} game process(es)")
     
     def load_config(self, config_path: str):
         """Load JSON configuration"""
         with open(config_path, 'r') as f:
             self.config = json.load(f)
+        self.config_path = os.path.abspath(config_path)
         
         suppression_config = self.config.get('suppression', {})
         self.suppression_enabled = suppression_config.get('enabled', True)
         self.toggle_key = suppression_config.get('toggle_key', 'f12').lower()
+        self.toggle_source = suppression_config.get('toggle_source', 'hook').lower()
+        
+        self.suppressed_keys = self._mapped_keyboard_keys(self.config)
     
-    def open_device(self) -> bool:
-        """Open HID device"""
-        devices = hid.enumerate(VENDOR_ID, PRODUCT_ID)
-        for dev in devices:
-            if dev['usage_page'] == 0xFF00 and dev['usage'] == HID_USAGE:
-                self.device = hid.device()
-                self.device.open_path(dev['path'])
-                self.device.set_nonblocking(False)
-                return True
-        return False
+    def open_devices(self, log_callback) -> bool:
+        """Open every board listed under 'keyboards', or the first one found"""
+        self.readers = []
+        wanted = self.config.get('keyboards') or [{}]
+        
+        if self.simulate:
+            for i, entry in enumerate(wanted):
+                self.readers.append(KeyboardReader(entry.get('name', f"keyboard{i + 1}"), SimulatedDevice()))
+            return True
+        
+        available = enumerate_keyboards()
+        for i, entry in enumerate(wanted):
+            name = entry.get('name', f"keyboard{i + 1}")
+            for dev in available:
+                path = dev['path'].decode('utf-8', 'replace') if isinstance(dev['path'], bytes) else dev['path']
+                if entry.get('path') not in (None, path):
+                    continue
+                if entry.get('serial') not in (None, dev.get('serial_number')):
+                    continue
+                if any(reader.path == path for reader in self.readers):
+                    continue
+                
+                try:
+                    device = hid.device()
+                    device.open_path(dev['path'])
+                    device.set_nonblocking(False)
+                except Exception as e:
+                    log_callback(f"⚠ Could not open keyboard '{name}': {e}")
+                    break
+                self.readers.append(KeyboardReader(name, device, dev['product_id'], path,
+                                                   dev.get('serial_number')))
+                break
+            else:
+                log_callback(f"⚠ Keyboard '{name}' not found")
+        
+        return bool(self.readers)
     
-    def create_gamepad(self):
-        """Create virtual Xbox 360 controller"""
-        self.gamepad = vg.VX360Gamepad()
+    def _bind_readers(self, log_callback):
+        """Point the mapping engine at the opened boards"""
+        primary = self.readers[0]
+        self.set_model(primary.model, primary.firmware)
+        self.assembler = primary.assembler
+        self._boards = {reader.name: reader for reader in self.readers}
+        
+        self.merge_frames = len(self.readers) > 1 and self.config.get('merge', 'max') == 'max'
+        self.key_heights = [0] * 128 if self.merge_frames else primary.assembler.key_heights
+        self._merge_sources = tuple(reader.assembler.key_heights for reader in self.readers)
+        self._merge_rest = self._merge_sources[1:]
+        
+        for key_name in self.unresolved_keys():
+            log_callback(f"⚠ Key '{key_name}' is not on the {self.model} layout")
+        self.prediction = self.config.get('prediction') or None
+        self.predictors = {}
+        self._prepare_profiles(log_callback)
+        if self.predictors:
+            log_callback(f"✓ Travel prediction {self.prediction.get('horizon_ms', PREDICTION_HORIZON_MS)} ms ahead")
+        self._capture = [] if self.capture_path else None
+        
+        for reader in self.readers:
+            reader.assembler.reset()
+            self._setup_control_keys(reader, log_callback)
+    
+    def create_pads(self):
+        """Create one virtual Xbox 360 controller per configured pad"""
+        names = self.config.get('pads') or ["pad1"]
+        self.pads = []
+        for name in names:
+            self.pads.append(VirtualPad(name, vg.VX360Gamepad()))
     
     def normalize_value(self, raw_value: int) -> float:
         """Normalize key height to 0-1 range with deadzone"""
@@ -195,263 +2537,578 @@ class DrunkDeerController:
         self.controller_enabled = self.suppression_enabled
         
         if not self.suppression_enabled:
-            for key in list(self.suppressed_keys):
-                try:
-                    kb.unblock_key(key)
-                except:
-                    pass
-            self.suppressed_keys.clear()
+            self.release_suppressed_keys()
             
-            if self.gamepad:
-                self.gamepad.reset()
-                self.gamepad.update()
+            with self._frame_lock:
+                for pad in self.pads:
+                    pad.neutral()
         else:
             self._suppress_mapped_keys()
     
+    def release_suppressed_keys(self):
+        """Let every mapped key through again; safe to call from any thread, any number of times"""
+        self.suppressor.active = False
+    
     def _suppress_mapped_keys(self):
-        """Suppress all keys defined in the config mappings"""
+        """Start blocking the keys defined in the config mappings"""
         if not self.suppression_enabled:
             return
         
-        for mapping in self.config.get('controller_mappings', {}).get('analog', {}).values():
-            key_name = mapping.get('drunkdeer_key')
-            if key_name:
-                self._suppress_single_key(key_name)
-        
-        for mapping in self.config.get('controller_mappings', {}).get('buttons', {}).values():
-            key_name = mapping.get('drunkdeer_key')
-            if key_name:
-                self._suppress_single_key(key_name)
+        with self._suppression_lock:
+            try:
+                self.suppressor.install()
+            except Exception:
+                return
+        self.suppressor.active = True
     
-    def _suppress_single_key(self, key_name: str):
-        """Suppress a single keyboard key"""
-        if not self.suppression_enabled:
-            return
-        
-        try:
-            kb_key = self._convert_key_name(key_name)
-            if kb_key and kb_key not in self.suppressed_keys:
-                kb.block_key(kb_key)
-                self.suppressed_keys.add(kb_key)
-        except Exception as e:
-            pass
+    def _mapped_keyboard_keys(self, config: dict) -> set:
+        """keyboard module names of every key in a config's mappings"""
+        keys = set()
+        for section in MAPPING_SECTIONS:
+            for mapping in config.get('controller_mappings', {}).get(section, {}).values():
+                key_name = mapping.get('drunkdeer_key')
+                if key_name:
+                    keys.add(self._convert_key_name(key_name))
+        return keys
     
     def _convert_key_name(self, drunkdeer_key: str) -> Optional[str]:
         """Convert DrunkDeer key names to keyboard module format"""
-        key_map = {
-            'SHF_L': 'shift',
-            'SHF_R': 'right shift',
-            'CTRL_L': 'ctrl',
-            'CTRL_R': 'right ctrl',
-            'ALT_L': 'alt',
-            'ALT_R': 'right alt',
-            'WIN_L': 'win',
-            'SPACE': 'space',
-            'RETURN': 'enter',
-            'BACK': 'backspace',
-            'TAB': 'tab',
-            'ESC': 'esc',
-            'CAPS': 'caps lock',
-            'APP': 'apps',
-            'MINUS': '-',
-            'PLUS': '=',
-            'BRKTS_L': '[',
-            'BRKTS_R': ']',
-            'COLON': ';',
-            'QOTATN': "'",
-            'COMMA': ',',
-            'PERIOD': '.',
-            'VIRGUE': '/',
-            'SLASH_K29': '\\',
-            'SWUNG': '`',
-            'INS': 'insert',
-            'DEL': 'delete',
-            'HOME': 'home',
-            'END': 'end',
-            'PGUP': 'page up',
-            'PGDN': 'page down',
-            'PRTSCN': 'print screen',
-        }
-        
-        return key_map.get(drunkdeer_key, drunkdeer_key.lower())
+        return KEYBOARD_KEY_NAMES.get(drunkdeer_key, drunkdeer_key.lower())
     
     def process_mappings(self):
-        """Process analog and button mappings"""
-        if not self.controller_enabled or not self.gamepad:
+        """Evaluate every pad's compiled mappings against the current frame"""
+        # Due macro steps run even while disabled so the wait loop never spins on them
+        scheduler = self.scheduler
+        now_ns = time.perf_counter_ns()
+        scheduler.run_due(now_ns)
+        if not self.controller_enabled or not self.pads:
             return
         
-        analog_accum = {
-            'LEFT_STICK_X': 0.0, 'LEFT_STICK_Y': 0.0,
-            'RIGHT_STICK_X': 0.0, 'RIGHT_STICK_Y': 0.0,
-            'LEFT_TRIGGER': 0.0, 'RIGHT_TRIGGER': 0.0
-        }
-        
-        for mapping in self.config.get('controller_mappings', {}).get('analog', {}).values():
-            key_idx = mapping.get('drunkdeer_index')
-            if key_idx is None:
-                key_name = mapping.get('drunkdeer_key')
-                key_idx = self.key_name_to_index.get(key_name)
-            
-            if key_idx is None or key_idx >= len(self.key_heights):
-                continue
+        if self.profile is not None and self.profile.layers:
+            self._update_layers()
+        
+        normalize = self.normalize_value
+        output_clock = self.output_rate_hz > 0
+        stages = self.watchdog.stages
+        for pad in self.pads:
+            mapping = pad.mapping
+            axes = pad.axes
+            for i in range(len(axes)):
+                axes[i] = 0.0
             
-            value = self.normalize_value(self.key_heights[key_idx])
-            controller_action = mapping.get('controller', '')
+            for heights, key_idx, axis, sign in mapping.summed:
+                axes[axis] += sign * normalize(heights[key_idx])
+            for resolver in mapping.resolvers:
+                axes[resolver.axis] += resolver.resolve(normalize)
+            mixed = None
+            if mapping.mix is not None:
+                mixed = mapping.mix.evaluate(normalize, self.deadzone_min, self.deadzone_max)
+                for axis in range(LEFT_TRIGGER_AXIS):
+                    axes[axis] += mixed[axis]
+            for axis in range(LEFT_TRIGGER_AXIS):
+                axes[axis] = max(-1.0, min(1.0, axes[axis]))
+            if mapping.shapes:
+                start = time.perf_counter_ns()
+                for shape in mapping.shapes:
+                    shape.apply(axes)
+                stages[FILTER] += time.perf_counter_ns() - start
             
-            if 'LEFT_STICK_X_NEGATIVE' in controller_action:
-                analog_accum['LEFT_STICK_X'] -= value
-            elif 'LEFT_STICK_X_POSITIVE' in controller_action:
-                analog_accum['LEFT_STICK_X'] += value
-            elif 'LEFT_STICK_Y_NEGATIVE' in controller_action:
-                analog_accum['LEFT_STICK_Y'] -= value
-            elif 'LEFT_STICK_Y_POSITIVE' in controller_action:
-                analog_accum['LEFT_STICK_Y'] += value
-            elif 'RIGHT_STICK_X_NEGATIVE' in controller_action:
-                analog_accum['RIGHT_STICK_X'] -= value
-            elif 'RIGHT_STICK_X_POSITIVE' in controller_action:
-                analog_accum['RIGHT_STICK_X'] += value
-            elif 'RIGHT_STICK_Y_NEGATIVE' in controller_action:
-                analog_accum['RIGHT_STICK_Y'] -= value
-            elif 'RIGHT_STICK_Y_POSITIVE' in controller_action:
-                analog_accum['RIGHT_STICK_Y'] += value
-            elif 'LEFT_TRIGGER' in controller_action:
-                analog_accum['LEFT_TRIGGER'] = max(analog_accum['LEFT_TRIGGER'], value)
-            elif 'RIGHT_TRIGGER' in controller_action:
-                analog_accum['RIGHT_TRIGGER'] = max(analog_accum['RIGHT_TRIGGER'], value)
-        
-        self.gamepad.left_joystick_float(
-            max(-1.0, min(1.0, analog_accum['LEFT_STICK_X'])),
-            max(-1.0, min(1.0, analog_accum['LEFT_STICK_Y']))
-        )
-        self.gamepad.right_joystick_float(
-            max(-1.0, min(1.0, analog_accum['RIGHT_STICK_X'])),
-            max(-1.0, min(1.0, analog_accum['RIGHT_STICK_Y']))
-        )
-        self.gamepad.left_trigger_float(max(0.0, min(1.0, analog_accum['LEFT_TRIGGER'])))
-        self.gamepad.right_trigger_float(max(0.0, min(1.0, analog_accum['RIGHT_TRIGGER'])))
-        
-        button_map = {
-            'A_BUTTON': vg.XUSB_BUTTON.XUSB_GAMEPAD_A,
-            'B_BUTTON': vg.XUSB_BUTTON.XUSB_GAMEPAD_B,
-            'X_BUTTON': vg.XUSB_BUTTON.XUSB_GAMEPAD_X,
-            'Y_BUTTON': vg.XUSB_BUTTON.XUSB_GAMEPAD_Y,
-            'LEFT_BUMPER': vg.XUSB_BUTTON.XUSB_GAMEPAD_LEFT_SHOULDER,
-            'RIGHT_BUMPER': vg.XUSB_BUTTON.XUSB_GAMEPAD_RIGHT_SHOULDER,
-            'START_BUTTON': vg.XUSB_BUTTON.XUSB_GAMEPAD_START,
-            'BACK_BUTTON': vg.XUSB_BUTTON.XUSB_GAMEPAD_BACK,
-            'LEFT_STICK_CLICK': vg.XUSB_BUTTON.XUSB_GAMEPAD_LEFT_THUMB,
-            'RIGHT_STICK_CLICK': vg.XUSB_BUTTON.XUSB_GAMEPAD_RIGHT_THUMB,
-            'DPAD_UP': vg.XUSB_BUTTON.XUSB_GAMEPAD_DPAD_UP,
-            'DPAD_DOWN': vg.XUSB_BUTTON.XUSB_GAMEPAD_DPAD_DOWN,
-            'DPAD_LEFT': vg.XUSB_BUTTON.XUSB_GAMEPAD_DPAD_LEFT,
-            'DPAD_RIGHT': vg.XUSB_BUTTON.XUSB_GAMEPAD_DPAD_RIGHT,
-        }
-        
-        for mapping in self.config.get('controller_mappings', {}).get('buttons', {}).values():
-            key_idx = mapping.get('drunkdeer_index')
-            if key_idx is None:
-                key_name = mapping.get('drunkdeer_key')
-                key_idx = self.key_name_to_index.get(key_name)
+            for heights, key_idx, axis in mapping.triggers:
+                value = normalize(heights[key_idx])
+                if value > axes[axis]:
+                    axes[axis] = min(1.0, value)
+            if mixed is not None:
+                for axis in (LEFT_TRIGGER_AXIS, RIGHT_TRIGGER_AXIS):
+                    if mixed[axis] > axes[axis]:
+                        axes[axis] = min(1.0, mixed[axis])
             
-            if key_idx is None or key_idx >= len(self.key_heights):
-                continue
-            
-            value = self.normalize_value(self.key_heights[key_idx])
-            controller_action = mapping.get('controller', '')
-            
-            if controller_action in button_map:
-                if value > 0.5:
-                    self.gamepad.press_button(button_map[controller_action])
+            # Buttons work on raw travel: press at actuation, release at release,
+            # or with rapid trigger on a travel change in either direction
+            buttons = 0
+            for heights, key_idx, button, state in mapping.buttons:
+                height = heights[key_idx]
+                if state.pressed:
+                    if height > state.extreme:
+                        state.extreme = height
+                    elif height <= state.release or \
+                            (state.rapid and state.extreme - height >= state.release_delta):
+                        state.pressed = False
+                        state.extreme = height
                 else:
-                    self.gamepad.release_button(button_map[controller_action])
+                    if height < state.extreme:
+                        state.extreme = height
+                    # After a rapid-trigger release the key re-arms on travel alone
+                    # until it rises back past the release point
+                    if state.rapid and state.extreme > state.release:
+                        threshold = state.extreme + state.press_delta
+                    else:
+                        threshold = state.actuation
+                    if height >= threshold:
+                        state.pressed = True
+                        state.extreme = height
+                if state.pressed:
+                    buttons |= button
+            if mapping.duals:
+                now = time.perf_counter()
+                for heights, key_idx, dual in mapping.duals:
+                    buttons |= dual.update(heights[key_idx], now)
+            for heights, key_idx, macro in mapping.macros:
+                macro.key(heights[key_idx], now_ns, scheduler)
+                buttons |= macro.bits
+            pad.buttons = buttons
+            
+            start = time.perf_counter_ns()
+            if output_clock:
+                pad.latch(now_ns)
+            else:
+                pad.send()
+            stages[OUTPUT] += time.perf_counter_ns() - start
+    
+    def _start_watchdog(self, log_callback):
+        """Set up the frame budget from the fastest board's poll interval or 'watchdog' in the config"""
+        settings = self.config.get('watchdog') or {}
+        interval = min(reader.poll_interval for reader in self.readers)
+        budget = settings.get('budget_ms', interval * WATCHDOG_BUDGET * 1000) / 1000.0
+        self.watchdog = FrameWatchdog(budget, bool(settings.get('shed', False)),
+                                      settings.get('overruns', WATCHDOG_OVERRUNS),
+                                      settings.get('recover_frames', WATCHDOG_RECOVER))
+        shedding = ", sheds optional stages when slipping" if self.watchdog.shedding else ""
+        log_callback(f"✓ Frame budget {budget * 1000:.2f} ms{shedding}")
+    
+    def _start_gc(self, log_callback):
+        """Keep collector pauses out of the scan loop as set by 'gc' in the config
+        
+        'freeze' moves everything built at startup (profiles, tables, tk) out of
+        the collector's reach so the passes that still run are short.
+        'scheduled' also turns automatic collection off and collects between
+        scans instead; 'disabled' never collects until Stop.
+        """
+        mode = self.config.get('gc', 'freeze')
+        if mode not in GC_MODES:
+            log_callback(f"⚠ Unknown gc mode '{mode}', using 'freeze'")
+            mode = 'freeze'
+        self.gc_mode = mode
+        self._gc_was_enabled = gc.isenabled()
+        if mode == 'default':
+            return
+        gc.collect()
+        gc.freeze()
+        if mode != 'freeze':
+            gc.disable()
+        log_callback(f"✓ Garbage collection: {mode}")
+    
+    def _collect_between_scans(self):
+        """Run the collection automatic gc would have run by now, oldest generation due first"""
+        counts = gc.get_count()
+        thresholds = gc.get_threshold()
+        for generation in (2, 1, 0):
+            if thresholds[generation] and counts[generation] >= thresholds[generation]:
+                gc.collect(generation)
+                return
+    
+    def _stop_gc(self):
+        """Hand collection back to Python; no collection here, it would hold up Stop"""
+        if self.gc_mode == 'default':
+            return
+        gc.unfreeze()
+        if self._gc_was_enabled:
+            gc.enable()
+        self.gc_mode = 'default'
+    
+    def _start_output_clock(self, log_callback):
+        """Send reports at output_rate_hz from their own thread, if configured"""
+        rate = min(self.config.get('output_rate_hz', 0), MAX_OUTPUT_RATE)
+        self.output_rate_hz = rate if rate > 0 else 0
+        self.interpolate = bool(self.config.get('interpolate', False))
+        if not self.output_rate_hz:
+            return
+        period = int(1e9 / self.output_rate_hz)
+        self.output_ticks = 0
         
-        self.gamepad.update()
+        def clock():
+            realtime = self._enter_realtime("output clock", log_callback)
+            try:
+                tick()
+            finally:
+                if realtime:
+                    realtime.restore()
+        
+        def tick():
+            next_tick = self._output_started = time.perf_counter_ns()
+            report_at = next_tick + int(1e9)
+            while True:
+                next_tick += period
+                delay = next_tick - time.perf_counter_ns()
+                if delay < -period:
+                    next_tick = time.perf_counter_ns()    # fell behind: skip missed ticks
+                # time.sleep is high resolution on Windows; Event.wait would round to ~15.6 ms
+                while delay > 0:
+                    time.sleep(min(delay / 1e9, STOP_CHECK_INTERVAL))
+                    if self._stop_event.is_set():
+                        return
+                    delay = next_tick - time.perf_counter_ns()
+                if self._stop_event.is_set():
+                    return
+                self.output_ticks += 1
+                if report_at and next_tick >= report_at:
+                    report_at = 0
+                    log_callback(f"✓ Output clock measured {self.measured_output_rate():.0f} Hz")
+                with self._frame_lock:
+                    if self.controller_enabled:
+                        interpolate = self.interpolate and 'interpolation' not in self.watchdog.shed
+                        now = time.perf_counter_ns()
+                        for pad in self.pads:
+                            pad.tick(now, interpolate)
+        
+        self._output_thread = threading.Thread(target=clock, daemon=True)
+        self._output_thread.start()
+        smoothing = ", interpolated" if self.interpolate else ""
+        log_callback(f"✓ Output clock {self.output_rate_hz:g} Hz{smoothing}")
+    
+    def measured_output_rate(self) -> float:
+        """Reports per second the output clock actually sent since it started"""
+        elapsed = time.perf_counter_ns() - self._output_started
+        return self.output_ticks * 1e9 / elapsed if self.output_ticks and elapsed > 0 else 0.0
     
     def run(self, log_callback):
         """Main loop"""
         self.running = True
+        self._stop_event.clear()
+        self._log = log_callback
         
-        if not self.open_device():
+        if not self.open_devices(log_callback):
             log_callback("ERROR: Could not open DrunkDeer keyboard")
             self.running = False
             return
         
-        log_callback("✓ DrunkDeer keyboard connected")
+        for reader in self.readers:
+            suffix = f" ({reader.name})" if len(self.readers) > 1 else ""
+            log_callback(f"✓ DrunkDeer keyboard connected{suffix}")
         
         try:
-            self.create_gamepad()
-            log_callback("✓ Virtual Xbox 360 controller created")
-        except Exception as e:
-            log_callback(f"ERROR: Could not create controller: {e}")
-            self.running = False
-            return
-        
-        self.device.write([0x04, 0xa0, 0x02])
-        time.sleep(0.1)
-        self.device.read(65, timeout_ms=1000)
-        
-        self.controller_enabled = self.suppression_enabled
-        if self.suppression_enabled:
-            self._suppress_mapped_keys()
-            log_callback("✓ Keyboard suppression enabled")
-        
-        status = "ON" if self.suppression_enabled else "OFF"
-        log_callback(f"✓ Running - Suppression {status} (press {self.toggle_key.upper()} to toggle)")
-        
-        self.device.write([0x04, 0xb6, 0x03, 0x01])
-        
-        while self.running:
             try:
-                data = self.device.read(65, timeout_ms=100)
-                if not data or len(data) < 5:
-                    continue
-                
-                if data[0] != 0x04 or data[1] != 0xb7:
-                    continue
-                
-                packet_type = data[4]
-                if packet_type == 0:
-                    base, length = 0, 59
-                elif packet_type == 1:
-                    base, length = 59, 59
-                elif packet_type == 2:
-                    base, length = 118, 8
+                self.create_pads()
+                if len(self.pads) == 1:
+                    log_callback("✓ Virtual Xbox 360 controller created")
                 else:
-                    continue
+                    log_callback(f"✓ {len(self.pads)} virtual Xbox 360 controllers created")
+            except Exception as e:
+                log_callback(f"ERROR: Could not create controller: {e}")
+                return
+            
+            for reader in self.readers:
+                reader.identify()
+                log_callback(f"✓ Identified DrunkDeer {reader.model} (firmware {reader.firmware or 'unknown'})")
+            self._bind_readers(log_callback)
+            
+            self.controller_enabled = self.suppression_enabled
+            if self.suppression_enabled:
+                self._suppress_mapped_keys()
+                log_callback("✓ Keyboard suppression enabled")
+            
+            status = "ON" if self.suppression_enabled else "OFF"
+            log_callback(f"✓ Running - Suppression {status} (press {self.toggle_key.upper()} to toggle)")
+            
+            # Resolved before any thread starts: each one applies it on entry
+            realtime = {**(self.config.get('realtime') or {}), **self.realtime_args}
+            self.realtime = bool(realtime.get('enabled', bool(realtime)))
+            self.realtime_cpu = realtime.get('cpu')
+            self._start_watcher(log_callback)
+            self._start_output_clock(log_callback)
+            self._start_gc(log_callback)
+            self.frame_gaps.clear()
+            self.drain_backlog = bool(self.config.get('drain_backlog', False))
+            self.idle_poll_interval = max(self.config.get('idle_poll_interval_ms', 0), 0) / 1000.0
+            self.idle_after = max(self.config.get('idle_after_ms', IDLE_AFTER * 1000), 0) / 1000.0
+            tuned = load_poll_tuning() if self.config.get('use_tuned_poll_interval', True) else {}
+            for reader in self.readers:
+                reader.poll_interval = self.poll_interval
+                if reader.path in tuned:
+                    reader.poll_interval = tuned[reader.path]['poll_interval_ms'] / 1000.0
+                    suffix = f" for {reader.name}" if len(self.readers) > 1 else ""
+                    log_callback(f"✓ Tuned poll interval {tuned[reader.path]['poll_interval_ms']} ms{suffix}")
+                reader.discarded = 0
+                reader.last_frame = 0.0
+                reader.idle = False
+                reader.last_active = time.perf_counter()
+                reader.wakes = 0
+                reader.wake_latency_total = reader.wake_latency_max = 0.0
+            if self.idle_poll_interval:
+                log_callback(f"✓ Idle polling every {self.idle_poll_interval * 1000:g} ms")
+            self._start_watchdog(log_callback)
+            
+            # One reader per board so each keeps its own scan rate
+            for reader in self.readers[1:]:
+                reader.thread = threading.Thread(target=self._read_loop, args=(reader, log_callback),
+                                                 daemon=True)
+                reader.thread.start()
+            self._read_loop(self.readers[0], log_callback)
+        finally:
+            self._shutdown()
+        
+        for reader in self.readers:
+            suffix = f" ({reader.name})" if len(self.readers) > 1 else ""
+            if reader.discarded:
+                log_callback(f"⚠ Skipped {reader.discarded} stale scans after stalls{suffix}")
+            if reader.wakes:
+                average = reader.wake_latency_total / reader.wakes * 1000
+                log_callback(f"Woke from idle {reader.wakes}x, wake latency up to "
+                             f"{average:.1f} ms avg / {reader.wake_latency_max * 1000:.1f} ms max{suffix}")
+        
+        if self.output_ticks:
+            rate = self.measured_output_rate()
+            mark = "⚠" if rate < self.output_rate_hz * 0.9 else "✓"
+            log_callback(f"{mark} Output clock ran at {rate:.0f} Hz (configured {self.output_rate_hz:g} Hz)")
+        
+        watchdog = self.watchdog
+        if watchdog.overruns:
+            log_callback(f"⚠ {watchdog.overruns} of {watchdog.frames} frames over the "
+                         f"{watchdog.budget / 1e6:.2f} ms budget")
+        
+        if len(self.frame_gaps) >= 100:
+            mode = "on" if self.realtime else "off"
+            log_callback(f"Frame jitter p99 {jitter_p99(self.frame_gaps.values()):.2f} ms (real-time {mode})")
+        
+        if self._stop_requested_at:
+            log_callback(f"Stopped ({self.shutdown_latency_ms:.1f} ms)")
+        else:
+            log_callback("Stopped")
+    
+    def _read_loop(self, reader: KeyboardReader, log_callback):
+        """Request and assemble scans from one board until Stop"""
+        device = reader.device
+        assembler = reader.assembler
+        interval = reader.poll_interval
+        primary = reader is self.readers[0]
+        realtime = self._enter_realtime(reader.name, log_callback)
+        parse_ns = 0                # packet parsing for the scan in progress
+        try:
+            requested = time.perf_counter()
+            device.write(SCAN_REQUEST)
+            
+            while not self._stop_event.is_set():
+                # Short timeout keeps a pending Stop from waiting on the device
+                data = device.read(65, timeout_ms=READ_TIMEOUT_MS)
                 
-                for i in range(length):
-                    idx = base + i
-                    if idx >= len(self.key_heights):
+                start = time.perf_counter_ns()
+                complete = assembler.feed(data)
+                parse_ns += time.perf_counter_ns() - start
+                if complete:
+                    if self._stop_event.is_set():
+                        break
+                    now = time.perf_counter()
+                    if self.drain_backlog and now - requested > interval + STALL_THRESHOLD:
+                        # Requested before a stall, so its travel is old: scan again now
+                        # instead of mapping it and then waiting a full interval
+                        reader.discarded += 1
+                        parse_ns = 0
+                        requested = time.perf_counter()
+                        device.write(SCAN_REQUEST)
                         continue
-                    self.key_heights[idx] = data[i + 4] if (i + 4) < len(data) else 0
-                
-                if packet_type == 2:
-                    self.process_mappings()
-                    time.sleep(self.poll_interval)
-                    self.device.write([0x04, 0xb6, 0x03, 0x01])
-            
-            except Exception as e:
-                log_callback(f"ERROR: {e}")
-                break
+                    gap = now - reader.last_frame
+                    if primary and reader.last_frame and interval == reader.poll_interval:
+                        self.frame_gaps.add(gap)        # idle-rate gaps are not jitter
+                    reader.last_frame = now
+                    if primary and (self.profiling_seconds or self._profiler is not None):
+                        self._step_profiler(now, log_callback)
+                    self._on_frame(reader, parse_ns)
+                    parse_ns = 0
+                    interval = self._scan_interval(reader, now, gap)
+                    if self._wait_for_scan(time.perf_counter() + interval, primary):
+                        break
+                    requested = time.perf_counter()
+                    device.write(SCAN_REQUEST)
         
-        for key in list(self.suppressed_keys):
+        except Exception as e:
+            suffix = f" ({reader.name})" if len(self.readers) > 1 else ""
+            log_callback(f"ERROR{suffix}: {e}")
+        finally:
+            # A board that drops out must not leave its keys held
+            assembler.reset()
+            if primary and self._profiler is not None:
+                self._step_profiler(None, log_callback)
+            if realtime:
+                realtime.restore()
+    
+    def start_profiling(self, seconds: float) -> bool:
+        """Profile the main reader thread for this long, starting with its next scan; False if one is running"""
+        if self._profiler is not None:
+            return False
+        self.profiling_seconds = seconds
+        return True
+    
+    def _step_profiler(self, now: Optional[float], log_callback):
+        """Start a requested profile on this thread, or end and save it when due (now=None ends it)"""
+        if self._profiler is None:
+            self._profiler = StackSampler(threading.get_ident())
+            self._profile_until = now + self.profiling_seconds
+            log_callback(f"✓ Profiling the controller thread for {self.profiling_seconds:g} s")
+            self._profiler.start()
+            return
+        if now is not None and now < self._profile_until:
+            return
+        self._profiler.stop()
+        name = self.profile.name if self.profile is not None else \
+            os.path.splitext(os.path.basename(self.config_path or "controller"))[0]
+        path = profile_filename(name)
+        try:
+            self._profiler.save(path)
+        except OSError as e:
+            log_callback(f"⚠ Could not save profile: {e}")
+        else:
+            log_callback(f"✓ Saved controller profile ({self._profiler.samples} samples) to {os.path.abspath(path)}")
+            hottest = ", ".join(f"{function} {share:.0%}" for function, share in self._profiler.hottest())
+            if hottest:
+                log_callback(f"  Hottest: {hottest}")
+        self._profiler = None
+        self.profiling_seconds = 0.0
+    
+    def _keys_in_use(self, reader: KeyboardReader) -> bool:
+        """Whether any key the profile or the board's control keys read is off its rest position"""
+        level = self.deadzone_min
+        for heights, key_idx in self.profile.watched:
+            if heights[key_idx] >= level:
+                return True
+        heights = reader.assembler.key_heights
+        for control in reader.assembler.control_keys:
+            if heights[control.index] >= level:
+                return True
+        return False
+    
+    def _enter_realtime(self, thread_name: str, log_callback) -> Optional[RealtimeMode]:
+        """Apply real-time mode to the calling thread if it is on"""
+        if not self.realtime:
+            return None
+        mode = RealtimeMode(self.realtime_cpu).apply()
+        if mode.applied:
+            log_callback(f"✓ Real-time {thread_name}: {', '.join(mode.applied)}")
+        if mode.failed:
+            log_callback(f"⚠ Real-time {thread_name} not applied: {'; '.join(mode.failed)}")
+        return mode
+    
+    def _scan_interval(self, reader: KeyboardReader, now: float, gap: float) -> float:
+        """Wait before the next scan: the board's poll interval in use, idle_poll_interval when disabled or at rest"""
+        if not self.idle_poll_interval:
+            return reader.poll_interval
+        if self.controller_enabled and self._keys_in_use(reader):
+            reader.last_active = now
+            if reader.idle:
+                # The press happened somewhere in the last (slow) gap
+                reader.idle = False
+                reader.wakes += 1
+                reader.wake_latency_total += gap
+                reader.wake_latency_max = max(reader.wake_latency_max, gap)
+        elif not reader.idle and (not self.controller_enabled or now - reader.last_active >= self.idle_after):
+            reader.idle = True
+        return self.idle_poll_interval if reader.idle else reader.poll_interval
+    
+    def _wait_for_scan(self, deadline: float, run_macros: bool) -> bool:
+        """Wait until the next scan is due, waking early for macro deadlines; True on Stop"""
+        if run_macros and self.gc_mode == 'scheduled':
+            self._collect_between_scans()
+        while True:
+            timeout = deadline - time.perf_counter()
+            due = self.scheduler.next_deadline() if run_macros else None
+            if due is not None:
+                timeout = min(timeout, (due - time.perf_counter_ns()) / 1e9)
+            if timeout > 0:
+                # Event.wait rounds to the ~15.6 ms Windows timer tick; time.sleep does not
+                time.sleep(min(timeout, STOP_CHECK_INTERVAL))
+            if self._stop_event.is_set():
+                return True
+            if time.perf_counter() >= deadline:
+                return False
+            if due is not None and time.perf_counter_ns() >= due:
+                with self._frame_lock:
+                    self.process_mappings()
+    
+    def _on_frame(self, reader: KeyboardReader, parse_ns: int = 0):
+        """Run controls and mappings for a completed scan from one board
+        
+        parse_ns is the time the reader spent parsing the scan's packets.
+        """
+        with self._frame_lock:
+            pending = self._pending_profile
+            if pending is not None:
+                self._pending_profile = None
+                self.switch_profile(pending)
+            watchdog = self.watchdog
+            watchdog.begin()
+            stages = watchdog.stages
+            stages[PARSE] = parse_ns
+            start = time.perf_counter_ns()
+            reader.assembler.run_controls()
+            if self.merge_frames:
+                # Deepest press across boards, in place
+                merged = self.key_heights
+                merged[:] = self._merge_sources[0]
+                for heights in self._merge_rest:
+                    for i in range(len(heights)):
+                        if heights[i] > merged[i]:
+                            merged[i] = heights[i]
+            self.frames += 1
+            fresh = reader.assembler.key_heights
+            if self._capture is not None and (self.merge_frames or self.key_heights is fresh):
+                self._capture.append((time.perf_counter_ns(), tuple(self.key_heights)))
+            now = time.perf_counter_ns()
+            if self.predictors:
+                shed = 'prediction' in watchdog.shed
+                for predictor in self.predictors.values():
+                    if predictor.source is fresh or (self.merge_frames and predictor.source is self.key_heights):
+                        if shed:
+                            predictor.reset()           # follow the real travel
+                        else:
+                            predictor.update(now)
+                stages[FILTER] = time.perf_counter_ns() - now
+            self.process_mappings()
+            message = watchdog.end(time.perf_counter_ns() - start + parse_ns)
+            if message:
+                self._log(message)
+    
+    def _shutdown(self):
+        """Neutralise the pad, release key blocks and hand back the HID devices"""
+        self._stop_event.set()
+        for reader in self.readers[1:]:
+            if reader.thread:
+                reader.thread.join(timeout=SHUTDOWN_TIMEOUT)
+        if self._watcher_thread:
+            self._watcher_thread.join(timeout=SHUTDOWN_TIMEOUT)
+            self._watcher_thread = None
+        if self._output_thread:
+            self._output_thread.join(timeout=SHUTDOWN_TIMEOUT)
+            self._output_thread = None
+        
+        for pad in self.pads:
             try:
-                kb.unblock_key(key)
-            except:
+                pad.neutral()
+            except Exception:
                 pass
-        self.suppressed_keys.clear()
         
-        if self.gamepad:
-            self.gamepad.reset()
-            self.gamepad.update()
-        if self.device:
-            self.device.close()
+        with self._suppression_lock:
+            self.suppressor.remove()
+        
+        for reader in self.readers:
+            reader.close()
         
-        log_callback("Stopped")
+        self._stop_gc()
+        
+        if self._capture:
+            try:
+                save_capture(self.capture_path, self._capture)
+            except OSError as e:
+                self._log(f"⚠ Could not save capture: {e}")
+            else:
+                self._log(f"✓ Captured {len(self._capture)} scans to {self.capture_path}")
+            self._capture = None
+        
+        if self._stop_requested_at:
+            self.shutdown_latency_ms = (time.perf_counter() - self._stop_requested_at) * 1000.0
+        self.running = False
     
     def stop(self):
-        """Stop the controller"""
-        self.running = False
+        """Stop the controller and wake the reader"""
+        self._stop_requested_at = time.perf_counter()
+        self._stop_event.set()
 
 
 class DrunkDeerGUI:
@@ -463,7 +3120,7 @@ class DrunkDeerGUI:
         self.controller = DrunkDeerController()
         self.controller_thread: Optional[threading.Thread] = None
         self.config_path = ""
-        self.hotkey_registered = False
+        self.hotkey_handle = None
         
         self.setup_ui()
         self.check_default_config()
@@ -539,8 +3196,21 @@ class DrunkDeerGUI:
     
     def save_last_config(self):
         """Save the current config path"""
+        self.save_settings(last_config=self.config_path)
+    
+    def load_settings(self) -> dict:
+        """Read dd2rl.json, empty if missing or broken"""
         try:
-            settings = {'last_config': self.config_path}
+            with open(SETTINGS_FILE, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def save_settings(self, **updates):
+        """Update entries in dd2rl.json, keeping the others"""
+        try:
+            settings = self.load_settings()
+            settings.update(updates)
             with open(SETTINGS_FILE, 'w') as f:
                 json.dump(settings, f)
         except Exception as e:
@@ -576,6 +3246,7 @@ class DrunkDeerGUI:
         self.config_entry = ttk.Entry(config_frame, width=50)
         self.config_entry.grid(row=0, column=1, sticky=(tk.W, tk.E), padx=5)
         ttk.Button(config_frame, text="Browse", command=self.browse_config).grid(row=0, column=2, padx=(5, 0))
+        ttk.Button(config_frame, text="Profiles", command=self.open_profile_picker).grid(row=0, column=3, padx=(5, 0))
         
         control_frame = ttk.LabelFrame(main_frame, text="Control", padding="10")
         control_frame.grid(row=2, column=0, sticky=(tk.W, tk.E), pady=(0, 10))
@@ -590,6 +3261,10 @@ class DrunkDeerGUI:
                                    width=15, state=tk.DISABLED)
         self.stop_btn.pack(side=tk.LEFT, padx=5)
         
+        self.profile_btn = ttk.Button(btn_frame, text=f"⏱ Profile {PROFILE_SECONDS} s",
+                                      command=self.profile_controller, width=15, state=tk.DISABLED)
+        self.profile_btn.pack(side=tk.LEFT, padx=5)
+        
         status_frame = ttk.Frame(control_frame)
         status_frame.pack(fill=tk.X, pady=(10, 0))
         
@@ -645,29 +3320,38 @@ class DrunkDeerGUI:
     
     def setup_hotkeys(self):
         """Setup hotkey from config for toggling"""
-        if self.hotkey_registered:
+        if self.hotkey_handle is not None:
             try:
-                kb.unhook_all()
+                kb.unhook(self.hotkey_handle)
             except:
                 pass
+            self.hotkey_handle = None
+        
+        self.controller.toggle_callback = self.report_toggle
+        toggle_key = self.controller.toggle_key
+        
+        if self.controller.toggle_source == "hid":
+            self.log(f"✓ Toggle key read from key travel: {toggle_key.upper()}")
+            return
         
         def on_toggle():
             if self.controller.running:
                 self.controller.toggle_suppression()
-                self.update_status_indicators()
-                if self.controller.suppression_enabled:
-                    self.log("✓ Controller ENABLED + Suppression ON")
-                else:
-                    self.log("⚠ Controller DISABLED + Suppression OFF")
+                self.report_toggle()
         
         try:
-            toggle_key = self.controller.toggle_key
-            kb.on_press_key(toggle_key, lambda _: on_toggle(), suppress=False)
-            self.hotkey_registered = True
+            self.hotkey_handle = kb.on_press_key(toggle_key, lambda _: on_toggle(), suppress=False)
             self.log(f"✓ Hotkey registered: {toggle_key.upper()}")
         except Exception as e:
             self.log(f"Warning: Hotkey setup failed: {e}")
-            self.hotkey_registered = False
+    
+    def report_toggle(self):
+        """Reflect a suppression toggle in the status labels and log"""
+        self.update_status_indicators()
+        if self.controller.suppression_enabled:
+            self.log("✓ Controller ENABLED + Suppression ON")
+        else:
+            self.log("⚠ Controller DISABLED + Suppression OFF")
     
     def browse_config(self):
         """Browse for config file"""
@@ -682,6 +3366,82 @@ class DrunkDeerGUI:
             self.save_last_config()
             self.log(f"Config loaded: {filename}")
     
+    def open_profile_picker(self):
+        """Searchable list of the profiles in the profile folder"""
+        directory = self.load_settings().get('profile_dir')
+        if not directory or not os.path.isdir(directory):
+            directory = os.path.dirname(self.config_path) if self.config_path else os.getcwd()
+        
+        picker = tk.Toplevel(self.root)
+        picker.title("Profiles")
+        picker.geometry("700x450")
+        picker.columnconfigure(0, weight=1)
+        picker.rowconfigure(1, weight=1)
+        
+        top = ttk.Frame(picker, padding="10")
+        top.grid(row=0, column=0, sticky=(tk.W, tk.E))
+        top.columnconfigure(1, weight=1)
+        ttk.Label(top, text="Search:").grid(row=0, column=0, sticky=tk.W, padx=(0, 5))
+        search_var = tk.StringVar()
+        search_entry = ttk.Entry(top, textvariable=search_var)
+        search_entry.grid(row=0, column=1, sticky=(tk.W, tk.E))
+        dir_label = ttk.Label(top, foreground="gray")
+        dir_label.grid(row=1, column=0, columnspan=2, sticky=tk.W, pady=(5, 0))
+        
+        tree = ttk.Treeview(picker, columns=("game", "description", "file"), show="headings")
+        for column, width in (("game", 180), ("description", 330), ("file", 150)):
+            tree.heading(column, text=column.capitalize())
+            tree.column(column, width=width)
+        tree.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), padx=10)
+        
+        state = {'catalog': None}
+        
+        def refresh(*_):
+            tree.delete(*tree.get_children())
+            if state['catalog'] is None:
+                return
+            for path, entry in state['catalog'].search(search_var.get()):
+                tree.insert("", tk.END, iid=path,
+                            values=(entry['game'], entry['description'], os.path.basename(path)))
+        
+        def load(new_directory):
+            catalog = ProfileCatalog(new_directory)
+            try:
+                parsed = catalog.scan()
+            except OSError as e:
+                self.log(f"Could not scan {new_directory}: {e}")
+                return
+            state['catalog'] = catalog
+            dir_label.config(text=f"{new_directory}  ({len(catalog.profiles())} profiles, {parsed} re-indexed)")
+            self.save_settings(profile_dir=new_directory)
+            refresh()
+        
+        def choose_directory():
+            new_directory = filedialog.askdirectory(parent=picker, initialdir=directory)
+            if new_directory:
+                load(new_directory)
+        
+        def use_selected(*_):
+            selection = tree.selection()
+            if not selection:
+                return
+            self.config_path = selection[0]
+            self.config_entry.delete(0, tk.END)
+            self.config_entry.insert(0, self.config_path)
+            self.save_last_config()
+            self.log(f"Config loaded: {self.config_path}")
+            picker.destroy()
+        
+        buttons = ttk.Frame(picker, padding="10")
+        buttons.grid(row=2, column=0, sticky=(tk.W, tk.E))
+        ttk.Button(buttons, text="Folder...", command=choose_directory).pack(side=tk.LEFT)
+        ttk.Button(buttons, text="Use Profile", command=use_selected).pack(side=tk.RIGHT)
+        
+        search_var.trace_add("write", refresh)
+        tree.bind("<Double-1>", use_selected)
+        load(directory)
+        search_entry.focus_set()
+    
     def log(self, message: str):
         """Add message to log"""
         timestamp = time.strftime("%H:%M:%S")
@@ -703,6 +3463,9 @@ class DrunkDeerGUI:
     
     def start_controller(self):
         """Start the controller"""
+        if self.controller_thread and self.controller_thread.is_alive():
+            self.log("⚠ Previous run is still shutting down")
+            return
         if not self.config_path:
             messagebox.showerror("Error", "Please select a config file first")
             return
@@ -724,6 +3487,7 @@ class DrunkDeerGUI:
         
         self.start_btn.config(state=tk.DISABLED)
         self.stop_btn.config(state=tk.NORMAL)
+        self.profile_btn.config(state=tk.NORMAL)
         
         self.log("Starting controller...")
         self.update_status_indicators()
@@ -740,15 +3504,60 @@ class DrunkDeerGUI:
         self.log("Stopping...")
         self.controller.stop()
         
+        still_running = False
         if self.controller_thread:
-            self.controller_thread.join(timeout=2)
+            self.controller_thread.join(timeout=SHUTDOWN_TIMEOUT)
+            still_running = self.controller_thread.is_alive()
+            if still_running:
+                self.log(f"⚠ Controller thread still running after {SHUTDOWN_TIMEOUT * 1000:.0f} ms")
+        
+        # Never leave keys blocked, even if the reader thread is wedged
+        self.controller.release_suppressed_keys()
         
-        self.start_btn.config(state=tk.NORMAL)
         self.stop_btn.config(state=tk.DISABLED)
+        self.profile_btn.config(state=tk.DISABLED)
         
         self.controller.controller_enabled = False
         self.controller.suppression_enabled = False
         self.update_status_indicators()
+        
+        # A second run would clear the stop event and revive the old thread
+        if still_running:
+            self.root.after(50, self._enable_start_when_stopped)
+        else:
+            self.start_btn.config(state=tk.NORMAL)
+    
+    def _enable_start_when_stopped(self):
+        """Re-enable Start once the previous controller thread has exited"""
+        if self.controller_thread and self.controller_thread.is_alive():
+            self.root.after(50, self._enable_start_when_stopped)
+            return
+        self.start_btn.config(state=tk.NORMAL)
+    
+    def profile_controller(self):
+        """Profile the controller thread for PROFILE_SECONDS"""
+        if not self.controller.start_profiling(PROFILE_SECONDS):
+            self.log("⚠ Already profiling")
+    
+    def apply_args(self, args):
+        """Apply command line options to the GUI fields"""
+        if args.config:
+            self.config_path = os.path.abspath(args.config)
+            self.config_entry.delete(0, tk.END)
+            self.config_entry.insert(0, self.config_path)
+        self.deadzone_min_var.set(args.deadzone_min)
+        self.deadzone_max_var.set(args.deadzone_max)
+        self.poll_interval_var.set(args.poll_interval)
+        self.controller.simulate = args.simulate
+        self.controller.capture_path = args.capture
+        if args.profile_controller:
+            self.controller.start_profiling(args.profile_controller)
+        if args.realtime or args.realtime_cpu is not None:
+            self.controller.realtime_args = {"enabled": True}
+            if args.realtime_cpu is not None:
+                self.controller.realtime_args["cpu"] = args.realtime_cpu
+        if args.simulate:
+            self.log("⚠ Simulated keyboard - no HID device will be opened")
     
     def on_closing(self):
         """Handle window close"""
@@ -763,9 +3572,76 @@ class DrunkDeerGUI:
         self.root.destroy()
 
 
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="DrunkDeer to virtual Xbox 360 controller")
+    parser.add_argument("--config", help="Config JSON file")
+    parser.add_argument("--deadzone-min", type=int, default=2, help="Minimum travel threshold (default: 2)")
+    parser.add_argument("--deadzone-max", type=int, default=40, help="Maximum travel for 100%% (default: 40)")
+    parser.add_argument("--poll-interval", type=int, default=5, help="Update interval in ms (default: 5)")
+    parser.add_argument("--simulate", action="store_true",
+                        help="Use a simulated keyboard instead of the HID device")
+    parser.add_argument("--benchmark-hook", action="store_true",
+                        help="Print the per-keystroke cost of the suppression handlers and exit")
+    parser.add_argument("--realtime", action="store_true",
+                        help="Raise the controller threads' priority and timer resolution")
+    parser.add_argument("--realtime-cpu", type=int, metavar="N",
+                        help="Pin the controller threads to CPU N (implies --realtime)")
+    parser.add_argument("--benchmark-realtime", action="store_true",
+                        help="Compare p99 frame jitter with real-time mode off and on (simulated) and exit")
+    parser.add_argument("--probe-hid", action="store_true",
+                        help="Measure the scan loop at several poll intervals, save the best one per board and exit")
+    parser.add_argument("--check-allocations", action="store_true",
+                        help="Report the bytes a simulated scan loop keeps per frame and exit")
+    parser.add_argument("--profile-controller", type=float, metavar="SECONDS",
+                        help="Profile the controller thread for SECONDS after Start and save a .folded stack file")
+    parser.add_argument("--capture", metavar="FILE",
+                        help="Record every scan to FILE while running, for --evaluate-prediction")
+    parser.add_argument("--evaluate-prediction", metavar="FILE",
+                        help="Replay a capture through travel prediction, print the error report and exit")
+    return parser.parse_args(argv)
+
+
 def main():
+    args = parse_args()
+    if args.benchmark_hook:
+        for (label, kind), ns in benchmark_suppression_hook().items():
+            print(f"{label:>16} {kind:>8}: {ns:7.1f} ns/event")
+        return
+    if args.benchmark_realtime:
+        for enabled, (p99, applied) in benchmark_realtime(cpu=args.realtime_cpu).items():
+            print(f"real-time {'on ' if enabled else 'off'}: p99 frame jitter {p99:.3f} ms")
+            for line in applied:
+                print(f"  {line}")
+        return
+    if args.probe_hid:
+        run_hid_probe(args.simulate)
+        return
+    if args.check_allocations:
+        report = check_allocations(args.config)
+        print(f"{report['bytes_per_frame']:.2f} bytes kept per frame over {report['frames']} frames")
+        for stat in report['top']:
+            print(f"  {stat}")
+        sys.exit(1 if report['bytes_per_frame'] > ALLOCATION_BUDGET else 0)
+    if args.evaluate_prediction:
+        settings = {}
+        if args.config:
+            with open(args.config, 'r') as f:
+                settings = json.load(f).get('prediction') or {}
+        frames = load_capture(args.evaluate_prediction)
+        horizons = sorted({4, 8, 12, 16, settings.get('horizon_ms', PREDICTION_HORIZON_MS)})
+        print(f"{'horizon':>8} {'raw err':>8} {'pred err':>8} {'raw p95':>8} {'pred p95':>8} {'saved':>7}")
+        for horizon in horizons:
+            report = evaluate_prediction(frames, horizon, settings.get('max_lead', PREDICTION_MAX_LEAD),
+                                         settings.get('history', PREDICTION_HISTORY))
+            print(f"{horizon:>6g}ms {report['raw_mean_error']:8.2f} {report['predicted_mean_error']:8.2f} "
+                  f"{report['raw_p95_error']:8.2f} {report['predicted_p95_error']:8.2f} "
+                  f"{report['latency_saved_ms']:5d}ms")
+        return
+    
     root = tk.Tk()
     app = DrunkDeerGUI(root)
+    app.apply_args(args)
     root.protocol("WM_DELETE_WINDOW", app.on_closing)
     root.mainloop()
 
@@ -0,0 +1,178 @@
+"""Load DD2RL.pyw against in-memory stand-ins for hid, vgamepad and keyboard
+
+The tests drive the controller with SimulatedDevice, so they run on any OS
+without a keyboard, the ViGEm driver or a global keyboard hook.
+"""
+import importlib.machinery
+import importlib.util
+import os
+import sys
+import threading
+import time
+import types
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class FakeGamepad:
+    """Records what the controller last sent to a virtual Xbox 360 pad"""
+    def __init__(self):
+        self.reset()
+        self.updates = 0
+    
+    def reset(self):
+        self.buttons = 0
+        self.left_stick = self.right_stick = (0.0, 0.0)
+        self.left_trigger = self.right_trigger = 0.0
+    
+    def press_button(self, button):
+        self.buttons |= button
+    
+    def release_button(self, button):
+        self.buttons &= ~button
+    
+    def left_joystick_float(self, x_value_float, y_value_float):
+        self.left_stick = (x_value_float, y_value_float)
+    
+    def right_joystick_float(self, x_value_float, y_value_float):
+        self.right_stick = (x_value_float, y_value_float)
+    
+    def left_trigger_float(self, value_float):
+        self.left_trigger = value_float
+    
+    def right_trigger_float(self, value_float):
+        self.right_trigger = value_float
+    
+    def update(self):
+        self.updates += 1
+
+
+class FakeKeyboard(types.ModuleType):
+    """The parts of the keyboard module DD2RL uses, without touching the OS"""
+    KEY_DOWN = 'down'
+    KEY_UP = 'up'
+    
+    def __init__(self):
+        super().__init__('keyboard')
+        self.hooks = []
+        self.key_hooks = {}
+    
+    def hook(self, callback, suppress=False):
+        self.hooks.append(callback)
+        return callback
+    
+    def hook_key(self, key, callback, suppress=False):
+        self.key_hooks.setdefault(key, []).append(callback)
+        return lambda: self.key_hooks[key].remove(callback)
+    
+    def unhook(self, handle):
+        if handle in self.hooks:
+            self.hooks.remove(handle)
+        else:
+            handle()
+    
+    def unhook_all(self):
+        self.hooks.clear()
+        self.key_hooks.clear()
+    
+    def dispatch(self, event):
+        """What keyboard's listener does with an event: False means blocked"""
+        for hook in self.hooks + self.key_hooks.get(event.scan_code, []):
+            if not hook(event):
+                return False
+        return True
+    
+    def on_press_key(self, key, callback, suppress=False):
+        return self.hook(callback, suppress)
+    
+    def key_to_scan_codes(self, name):
+        return (sum(map(ord, name)) % 200 + 1,)
+
+
+def _install_fakes():
+    hid = types.ModuleType('hid')
+    hid.enumerate = lambda *args, **kwargs: []
+    hid.device = object
+    sys.modules['hid'] = hid
+    
+    vgamepad = types.ModuleType('vgamepad')
+    vgamepad.XUSB_BUTTON = type('XUSB_BUTTON', (), {
+        'XUSB_GAMEPAD_DPAD_UP': 0x0001, 'XUSB_GAMEPAD_DPAD_DOWN': 0x0002,
+        'XUSB_GAMEPAD_DPAD_LEFT': 0x0004, 'XUSB_GAMEPAD_DPAD_RIGHT': 0x0008,
+        'XUSB_GAMEPAD_START': 0x0010, 'XUSB_GAMEPAD_BACK': 0x0020,
+        'XUSB_GAMEPAD_LEFT_THUMB': 0x0040, 'XUSB_GAMEPAD_RIGHT_THUMB': 0x0080,
+        'XUSB_GAMEPAD_LEFT_SHOULDER': 0x0100, 'XUSB_GAMEPAD_RIGHT_SHOULDER': 0x0200,
+        'XUSB_GAMEPAD_GUIDE': 0x0400, 'XUSB_GAMEPAD_A': 0x1000, 'XUSB_GAMEPAD_B': 0x2000,
+        'XUSB_GAMEPAD_X': 0x4000, 'XUSB_GAMEPAD_Y': 0x8000,
+    })
+    vgamepad.VX360Gamepad = FakeGamepad
+    sys.modules['vgamepad'] = vgamepad
+    
+    sys.modules['keyboard'] = FakeKeyboard()
+    
+    sv_ttk = types.ModuleType('sv_ttk')
+    sv_ttk.set_theme = lambda theme: None
+    sys.modules['sv_ttk'] = sv_ttk
+
+
+@pytest.fixture(scope="session")
+def dd2rl():
+    """The DD2RL.pyw module"""
+    _install_fakes()
+    loader = importlib.machinery.SourceFileLoader('DD2RL', os.path.join(ROOT, 'DD2RL.pyw'))
+    spec = importlib.util.spec_from_loader('DD2RL', loader)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules['DD2RL'] = module
+    loader.exec_module(module)
+    return module
+
+
+class Run:
+    """A controller running against the simulated keyboard on its own thread"""
+    def __init__(self, controller):
+        self.controller = controller
+        self.log = []
+        self.thread = threading.Thread(target=controller.run, args=(self.log.append,), daemon=True)
+    
+    def start(self, timeout: float = 2.0):
+        self.thread.start()
+        deadline = time.perf_counter() + timeout
+        while not self.controller.frames:
+            assert time.perf_counter() < deadline, f"no frame within {timeout} s: {self.log}"
+            time.sleep(0.001)
+        return self
+    
+    def wait_for(self, condition, timeout: float = 2.0):
+        deadline = time.perf_counter() + timeout
+        while not condition():
+            assert time.perf_counter() < deadline, f"timed out: {self.log}"
+            time.sleep(0.001)
+    
+    def stop(self, timeout: float = 2.0):
+        self.controller.stop()
+        self.thread.join(timeout)
+
+
+@pytest.fixture
+def run_controller(dd2rl, tmp_path):
+    """Start a simulated controller from a config dict; stopped after the test"""
+    runs = []
+    
+    def start(config: dict, **attributes):
+        path = tmp_path / "config.json"
+        path.write_text(dd2rl.json.dumps(config))
+        controller = dd2rl.DrunkDeerController()
+        controller.simulate = True
+        controller.load_config(str(path))
+        for name, value in attributes.items():
+            setattr(controller, name, value)
+        run = Run(controller)
+        runs.append(run)
+        return run.start()
+    
+    yield start
+    for run in runs:
+        if run.thread.is_alive():
+            run.stop()
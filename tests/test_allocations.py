@@ -0,0 +1,61 @@
+"""The scan loop keeps no memory per frame"""
+import os
+import threading
+import time
+import tracemalloc
+
+CONFIG = {
+    "suppression": {"enabled": True},
+    "gc": "default",
+    "controller_mappings": {
+        "analog": {
+            "throttle": {"drunkdeer_key": "W", "controller": "RIGHT_TRIGGER"},
+            "brake": {"drunkdeer_key": "S", "controller": "LEFT_TRIGGER"},
+            "left": {"drunkdeer_key": "A", "controller": "LEFT_STICK_LEFT"},
+            "right": {"drunkdeer_key": "D", "controller": "LEFT_STICK_RIGHT"},
+        },
+        "buttons": {"jump": {"drunkdeer_key": "SPACE", "controller": "A_BUTTON"}},
+    },
+}
+
+# A snapshot can land mid-frame and catch that frame's temporaries (a
+# travel float, the list hidapi returned) alive; a per-frame leak would
+# show up as at least one object for each of the measured frames.
+IN_FLIGHT = 1024    # bytes
+FRAMES = 2000
+
+
+def test_scan_loop_keeps_nothing_per_frame(dd2rl, run_controller):
+    run = run_controller(CONFIG, poll_interval=0.001)
+    controller = run.controller
+    device = controller.readers[0].device
+    keys = [controller.key_name_to_index[name] for name in ("W", "S", "A", "D", "SPACE")]
+    moving = threading.Event()
+    
+    def move():
+        step = 0
+        while not moving.is_set():
+            travel = abs(step % 80 - 40)    # full press and release every 80 steps
+            for key in keys:
+                device.key_heights[key] = travel
+            step += 1
+            time.sleep(0.001)
+    
+    mover = threading.Thread(target=move, daemon=True)
+    mover.start()
+    only_dd2rl = [tracemalloc.Filter(True, os.path.abspath(dd2rl.__file__))]
+    tracemalloc.start()
+    try:
+        run.wait_for(lambda: controller.frames > 300, timeout=10.0)     # warm up every path
+        before = tracemalloc.take_snapshot().filter_traces(only_dd2rl)
+        start = controller.frames
+        run.wait_for(lambda: controller.frames > start + FRAMES, timeout=30.0)
+        after = tracemalloc.take_snapshot().filter_traces(only_dd2rl)
+    finally:
+        tracemalloc.stop()
+        moving.set()
+        mover.join()
+    
+    stats = after.compare_to(before, 'lineno')
+    growth = sum(stat.size_diff for stat in stats)
+    assert growth <= IN_FLIGHT, [str(stat) for stat in stats if stat.size_diff > 0][:5]
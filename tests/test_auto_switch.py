@@ -0,0 +1,61 @@
+"""Foreground-process profile switching driven by a fake process source"""
+import json
+
+
+class FakeProcessSource:
+    """Stands in for ForegroundProcessSource; tests set `pid`"""
+    def __init__(self, executables: dict):
+        self.pid = 1
+        self.executables = executables
+        self.lookups = 0
+    
+    def foreground(self):
+        return self.pid
+    
+    def executable(self, pid):
+        self.lookups += 1
+        return self.executables.get(pid)
+
+
+def write_profiles(tmp_path):
+    boat = tmp_path / "boat.json"
+    boat.write_text(json.dumps({
+        "processes": ["Boat.exe"],
+        "controller_mappings": {"analog": {"throttle": {"drunkdeer_key": "W", "controller": "RIGHT_TRIGGER"}}},
+    }))
+    return {
+        "suppression": {"enabled": True},
+        "auto_switch_interval_ms": 50,
+        "profiles": [{"path": "boat.json"}],
+        "controller_mappings": {"analog": {"throttle": {"drunkdeer_key": "S", "controller": "RIGHT_TRIGGER"}}},
+    }, str(boat)
+
+
+def test_foreground_game_switches_profile(run_controller, tmp_path):
+    config, boat = write_profiles(tmp_path)
+    source = FakeProcessSource({1: r"C:\Windows\explorer.exe", 2: r"C:\Games\Boat.exe"})
+    run = run_controller(config, process_source=source)
+    controller = run.controller
+    assert controller.profile.path != boat
+    
+    source.pid = 2
+    run.wait_for(lambda: controller.profile.path == boat)
+    frames = controller.frames
+    run.wait_for(lambda: controller.frames > frames + 5)
+    
+    assert run.thread.is_alive()
+    assert not [line for line in run.log if line.startswith("ERROR")]
+
+
+
+def test_watcher_looks_up_each_process_once(dd2rl):
+    source = FakeProcessSource({1: "/usr/bin/shell", 2: r"C:\Games\Boat.exe"})
+    matches = []
+    watcher = dd2rl.ForegroundWatcher(source, {"boat.exe": "boat.json"}, matches.append)
+    
+    for pid in (1, 2, 2, 1, 2):
+        source.pid = pid
+        watcher.poll()
+    
+    assert matches == ["boat.json", "boat.json"]
+    assert source.lookups == 2
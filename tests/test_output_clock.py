@@ -0,0 +1,12 @@
+"""The output clock keeps its configured cadence and reports what it achieved"""
+import re
+
+
+def test_output_clock_reports_measured_rate(run_controller):
+    run = run_controller({"suppression": {"enabled": True}, "output_rate_hz": 500})
+    run.wait_for(lambda: any("Output clock measured" in line for line in run.log), timeout=3.0)
+    line = next(line for line in run.log if "Output clock measured" in line)
+    assert float(re.search(r"measured (\d+) Hz", line).group(1)) >= 450
+    
+    run.stop()
+    assert any(re.search(r"Output clock ran at \d+ Hz \(configured 500 Hz\)", line) for line in run.log)
@@ -0,0 +1,19 @@
+"""The prediction report only counts keys that actually moved"""
+
+
+def capture(key, packet_type_bytes=True):
+    frames = []
+    for n in range(400):
+        heights = [0] * 128
+        if packet_type_bytes:
+            heights[59], heights[118] = 1, 2
+        heights[key] = abs(n % 40 - 20) * 2        # press and release every 40 scans
+        frames.append((n * 5_000_000, tuple(heights)))
+    return frames
+
+
+def test_packet_type_slots_do_not_dilute_errors(dd2rl):
+    plain = dd2rl.evaluate_prediction(capture(30, packet_type_bytes=False))
+    quirky = dd2rl.evaluate_prediction(capture(30))
+    assert quirky["raw_mean_error"] == plain["raw_mean_error"] > 0
+    assert quirky["predicted_mean_error"] == plain["predicted_mean_error"]
@@ -0,0 +1,32 @@
+"""--probe-hid reports which packet of a scan goes missing"""
+
+
+def dropping(dd2rl, packet_type, every):
+    """SimulatedDevice that swallows one packet type of every `every`th scan"""
+    device = dd2rl.SimulatedDevice(scan_time=0)
+    read = device.read
+    scans = 0
+    
+    def lossy_read(size, timeout_ms=0):
+        nonlocal scans
+        reply = read(size, timeout_ms)
+        if reply and reply[1] == 0xb7 and reply[4] == packet_type:
+            scans += 1
+            if scans % every == 0:
+                return lossy_read(size, timeout_ms)
+        return reply
+    device.read = lossy_read
+    return device
+
+
+def test_missing_packet_types_are_counted_separately(dd2rl):
+    result = dd2rl.probe_hid(dropping(dd2rl, 1, every=4), 'serial', interval_ms=0, duration=0.2)
+    assert result["packet_loss"][0] == 0 and result["packet_loss"][2] == 0
+    assert 0.2 < result["packet_loss"][1] < 0.3
+    assert abs(result["loss"] - result["packet_loss"][1]) < 0.01
+
+
+def test_last_packet_lost_to_timeout(dd2rl):
+    result = dd2rl.probe_hid(dropping(dd2rl, 2, every=2), 'serial', interval_ms=0, duration=0.3)
+    assert result["packet_loss"][0] == 0 and result["packet_loss"][1] == 0
+    assert 0.4 < result["packet_loss"][2] <= 0.5
@@ -0,0 +1,29 @@
+"""The controller profile covers the reader thread and nothing else"""
+import os
+import threading
+
+
+def test_profile_samples_only_the_reader_thread(dd2rl, run_controller, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    stop = threading.Event()
+    
+    def busy_elsewhere():
+        while not stop.is_set():
+            sum(range(1000))
+    
+    other = threading.Thread(target=busy_elsewhere, daemon=True)
+    other.start()
+    try:
+        run = run_controller({"suppression": {"enabled": True}})
+        assert run.controller.start_profiling(0.3)
+        run.wait_for(lambda: any("Saved controller profile" in line for line in run.log))
+    finally:
+        stop.set()
+        other.join()
+    
+    saved, = [name for name in os.listdir(tmp_path) if name.endswith(".folded")]
+    stacks = (tmp_path / saved).read_text().splitlines()
+    assert stacks
+    assert any("_read_loop" in stack for stack in stacks)
+    assert not any("busy_elsewhere" in stack for stack in stacks)
+    assert all(int(stack.rsplit(" ", 1)[1]) > 0 for stack in stacks)
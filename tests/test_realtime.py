@@ -0,0 +1,50 @@
+"""Real-time mode reaches every controller thread and is undone afterwards"""
+import os
+import sys
+import threading
+
+import pytest
+
+
+def on_thread(function):
+    result = {}
+    thread = threading.Thread(target=lambda: result.update(function()))
+    thread.start()
+    thread.join()
+    return result
+
+
+@pytest.mark.skipif(not hasattr(os, 'sched_setaffinity'), reason="needs Linux CPU affinity")
+def test_pins_and_restores_the_calling_thread(dd2rl):
+    before = os.sched_getaffinity(0)
+    
+    def pin():
+        mode = dd2rl.RealtimeMode(cpu=0).apply()
+        pinned = os.sched_getaffinity(0)
+        nice = os.getpriority(os.PRIO_PROCESS, threading.get_native_id())
+        mode.restore()
+        return {"mode": mode, "pinned": pinned, "nice": nice,
+                "restored": os.sched_getaffinity(0),
+                "nice_after": os.getpriority(os.PRIO_PROCESS, threading.get_native_id())}
+    
+    result = on_thread(pin)
+    assert result["pinned"] == {0}
+    assert result["restored"] == before
+    assert "CPU 0" in result["mode"].applied
+    if "nice -10" in result["mode"].applied:
+        assert result["nice"] == dd2rl.REALTIME_NICE
+        assert result["nice_after"] != dd2rl.REALTIME_NICE
+    else:
+        # Lowering nice needs root or CAP_SYS_NICE; it must be reported, not hidden
+        assert any(failure.startswith("nice") for failure in result["mode"].failed)
+    assert os.sched_getaffinity(0) == before        # other threads untouched
+
+
+def test_output_clock_gets_realtime_on_first_start(dd2rl, run_controller):
+    if sys.platform != 'win32' and not hasattr(os, 'sched_setaffinity'):
+        pytest.skip("no CPU affinity to apply on this platform")
+    run = run_controller({"suppression": {"enabled": True}, "output_rate_hz": 500,
+                          "realtime": {"enabled": True, "cpu": 0}})
+    run.wait_for(lambda: any("Real-time output clock" in line for line in run.log))
+    lines = [line for line in run.log if "Real-time output clock" in line]
+    assert any(line.startswith("✓ Real-time output clock:") and "CPU 0" in line for line in lines), lines
@@ -0,0 +1,58 @@
+"""Stop must zero the pad, drop the key hook and finish within a frame"""
+import pytest
+
+CONFIG = {
+    "suppression": {"enabled": True},
+    "controller_mappings": {
+        "analog": {"throttle": {"drunkdeer_key": "W", "controller": "RIGHT_TRIGGER"}},
+        "buttons": {"jump": {"drunkdeer_key": "SPACE", "controller": "A_BUTTON"}},
+    },
+}
+
+
+def press(run, *keys):
+    controller = run.controller
+    for key in keys:
+        controller.readers[0].device.key_heights[controller.key_name_to_index[key]] = 40
+    gamepad = controller.pads[0].gamepad
+    run.wait_for(lambda: gamepad.right_trigger > 0 and gamepad.buttons)
+    return gamepad
+
+
+@pytest.mark.parametrize("extra", [{}, {"idle_poll_interval_ms": 500, "idle_after_ms": 0}],
+                         ids=["active", "idle"])
+def test_stop_is_bounded_and_leaves_nothing_behind(dd2rl, run_controller, extra):
+    keyboard = dd2rl.kb
+    hooked = lambda: keyboard.hooks or any(keyboard.key_hooks.values())
+    run = run_controller({**CONFIG, **extra})
+    if extra:
+        # Idle polling only pauses between scans once nothing is pressed
+        run.wait_for(lambda: run.controller.readers[0].idle)
+    else:
+        press(run, "W", "SPACE")
+    gamepad = run.controller.pads[0].gamepad
+    devices = [reader.device for reader in run.controller.readers]
+    assert hooked()
+    
+    run.controller.stop()
+    run.thread.join(dd2rl.SHUTDOWN_TIMEOUT)
+    
+    assert not run.thread.is_alive()
+    assert run.controller.shutdown_latency_ms <= dd2rl.SHUTDOWN_TIMEOUT * 1000
+    assert gamepad.right_trigger == 0.0 and gamepad.buttons == 0
+    assert not hooked()
+    assert all(device.closed for device in devices)
+
+
+@pytest.mark.parametrize("mode", ["freeze", "scheduled", "disabled"])
+def test_gc_mode_does_not_slow_stop(dd2rl, run_controller, mode):
+    heap = [[i] for i in range(1_000_000)]     # a GUI's worth of live objects
+    run = run_controller({**CONFIG, "gc": mode})
+    
+    run.controller.stop()
+    run.thread.join(dd2rl.SHUTDOWN_TIMEOUT)
+    
+    assert not run.thread.is_alive()
+    assert run.controller.shutdown_latency_ms <= dd2rl.SHUTDOWN_TIMEOUT * 1000
+    assert dd2rl.gc.isenabled() and not dd2rl.gc.get_freeze_count()
+    del heap
@@ -0,0 +1,43 @@
+"""drain_backlog drops a scan that went stale during a stall and scans again"""
+import time
+
+
+def stall_next_read(device, seconds, during=None):
+    """Delay the next read by `seconds`, after the scan request was answered"""
+    read = device.read
+    
+    def stalled(size, timeout_ms=0):
+        device.read = read
+        if during:
+            during()
+        time.sleep(seconds)
+        return read(size, timeout_ms)
+    device.read = stalled
+
+
+def test_stale_scan_is_dropped_and_rescanned(run_controller):
+    run = run_controller({
+        "suppression": {"enabled": True},
+        "drain_backlog": True,
+        "controller_mappings": {"analog": {"throttle": {"drunkdeer_key": "W", "controller": "RIGHT_TRIGGER"}}},
+    })
+    controller = run.controller
+    reader = controller.readers[0]
+    device = reader.device
+    run.wait_for(lambda: controller.frames > 20)
+    assert reader.discarded == 0        # the first scan is not a stall
+    
+    key = controller.key_name_to_index["W"]
+    seen = []
+    on_frame = controller._on_frame
+    
+    def record(reader, parse_ns=0):
+        seen.append(reader.assembler.key_heights[key])
+        on_frame(reader, parse_ns)
+    controller._on_frame = record
+    stall_next_read(device, 0.1, during=lambda: device.key_heights.__setitem__(key, 40))
+    
+    run.wait_for(lambda: seen)
+    # The stale scan, still showing W up, was never mapped
+    assert seen[0] == 40
+    assert reader.discarded == 1
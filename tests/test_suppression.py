@@ -0,0 +1,67 @@
+"""KeyboardSuppressor never leaves a key stuck down in the OS"""
+
+
+class Event:
+    def __init__(self, dd2rl, scan_code, down):
+        self.scan_code = scan_code
+        self.event_type = dd2rl.kb.KEY_DOWN if down else dd2rl.kb.KEY_UP
+
+
+def test_key_held_at_stop_is_not_blocked_next_run(dd2rl):
+    send = lambda code, down: dd2rl.kb.dispatch(Event(dd2rl, code, down))
+    suppressor = dd2rl.KeyboardSuppressor()
+    suppressor.set_scan_codes({30})
+    suppressor.install()
+    suppressor.active = True
+    assert send(30, True) is False
+    suppressor.remove()
+    
+    suppressor.install()            # next run, suppression toggled off
+    assert send(30, True) is True
+    assert send(30, False) is True
+    suppressor.remove()
+
+
+def test_key_up_follows_its_key_down(dd2rl):
+    send = lambda code, down: dd2rl.kb.dispatch(Event(dd2rl, code, down))
+    suppressor = dd2rl.KeyboardSuppressor()
+    suppressor.set_scan_codes({30})
+    suppressor.install()
+    suppressor.active = True
+    assert send(30, True) is False
+    suppressor.active = False       # toggled off while held
+    assert send(30, False) is False
+    assert send(30, True) is True
+    assert send(30, False) is True
+    suppressor.remove()
+
+
+def test_unmapped_keys_run_no_handler(dd2rl):
+    suppressor = dd2rl.KeyboardSuppressor()
+    suppressor.set_scan_codes({30, 31})
+    suppressor.install()
+    assert dd2rl.kb.hooks == []
+    assert sorted(code for code, handlers in dd2rl.kb.key_hooks.items() if handlers) == [30, 31]
+    assert dd2rl.kb.dispatch(Event(dd2rl, 40, True)) is True
+    suppressor.remove()
+    assert all(not handlers for handlers in dd2rl.kb.key_hooks.values())
+
+
+def test_profile_switch_hooks_only_the_difference(dd2rl):
+    send = lambda code, down: dd2rl.kb.dispatch(Event(dd2rl, code, down))
+    suppressor = dd2rl.KeyboardSuppressor()
+    suppressor.set_scan_codes({30, 31})
+    suppressor.install()
+    suppressor.active = True
+    kept = dd2rl.kb.key_hooks[31][0]
+    assert send(30, True) is False
+    
+    suppressor.set_scan_codes({31, 32})     # 30 is still held
+    assert dd2rl.kb.key_hooks[31] == [kept]
+    assert len(dd2rl.kb.key_hooks[32]) == 1
+    assert send(30, False) is False         # its key-up stays swallowed
+    assert send(30, True) is True
+    
+    suppressor.set_scan_codes({31, 32})
+    assert dd2rl.kb.key_hooks[30] == []
+    suppressor.remove()
@@ -0,0 +1,38 @@
+"""FrameWatchdog sheds only smoothing, in order, and brings it back"""
+
+
+def slip(watchdog, frames, elapsed):
+    messages = []
+    for _ in range(frames):
+        watchdog.begin()
+        message = watchdog.end(elapsed)
+        if message:
+            messages.append(message)
+    return messages
+
+
+def test_sheds_interpolation_then_prediction_and_restores(dd2rl):
+    watchdog = dd2rl.FrameWatchdog(0.002, shed=True, overruns=3, recover=10)
+    
+    slip(watchdog, 3, 3_000_000)
+    assert watchdog.shed == {'interpolation'}
+    slip(watchdog, 30, 3_000_000)
+    assert watchdog.shed == {'interpolation', 'prediction'}
+    
+    slip(watchdog, 10, 1_000_000)
+    assert watchdog.shed == {'interpolation'}
+    slip(watchdog, 10, 1_000_000)
+    assert watchdog.shed == set()
+
+
+def test_reports_without_shedding_when_off(dd2rl):
+    watchdog = dd2rl.FrameWatchdog(0.002, overruns=3)
+    messages = slip(watchdog, 3, 3_000_000)
+    assert len(messages) == 1 and "over the 2.00 ms budget" in messages[0]
+    assert not watchdog.shed
+
+
+def test_parse_stage_times_packet_parsing(dd2rl, run_controller):
+    run = run_controller({"suppression": {"enabled": True}})
+    watchdog = run.controller.watchdog
+    run.wait_for(lambda: watchdog.frames > 5 and watchdog.stages[dd2rl.PARSE] > 0)